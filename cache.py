@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()  # Markierung für "kein gültiger Eintrag", da auch None ein gecachter Wert sein kann
+
+
+class LRUCache:
+    """Begrenzter Cache mit Ablaufzeit: höchstens max_size Einträge, bei Überschreitung wird der am längsten nicht
+    benutzte verdrängt (LRU); Einträge, die älter als ttl Sekunden sind, gelten als nicht vorhanden. Zählt Treffer,
+    Fehlschläge, Verdrängungen und abgelaufene Einträge für die Überwachung."""
+
+    def __init__(self, max_size: int = 1000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # Schlüssel -> (Zeitpunkt des Eintragens, Wert), zuletzt benutzte am Ende
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key, default=None):
+        """Gültigen Eintrag zurückgeben und als zuletzt benutzt markieren, sonst default."""
+        with self._lock:
+            value = self._get(key)
+            if value is _MISSING:
+                self._misses += 1
+                return default
+            self._hits += 1
+            return value
+
+    def peek(self, key, default=None):
+        """Gültigen Eintrag zurückgeben, ohne ihn als benutzt zu markieren und ohne Treffer oder Fehlschlag zu zählen;
+        z. B. um nachzusehen, ob ein Objekt bereits gecacht ist."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return default
+        return entry[1]
+
+    def get_or_load(self, key, load):
+        """Read-through: gültigen Eintrag zurückgeben oder den Wert mit load() holen und eintragen. Haben zwei Threads
+        gleichzeitig geladen, gewinnt der zuerst eingetragene Wert, damit es pro Schlüssel nur ein Objekt gibt."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        loaded_value = load()  # außerhalb der Sperre laden, andere Schlüssel bleiben derweil erreichbar
+        with self._lock:
+            value = self._get(key)
+            if value is _MISSING:
+                value = loaded_value
+                self._put(key, value)
+            return value
+
+    def put(self, key, value):
+        """Eintrag setzen oder ersetzen."""
+        with self._lock:
+            self._put(key, value)
+
+    def pop(self, key, default=None):
+        """Eintrag entfernen (invalidieren) und seinen Wert zurückgeben, falls vorhanden."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def discard_where(self, predicate) -> int:
+        """Alle Einträge entfernen, für die predicate(key, value) zutrifft. Gibt ihre Anzahl zurück."""
+        with self._lock:
+            keys = [key for key, (stored_at, value) in self._entries.items() if predicate(key, value)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        """Alle Einträge entfernen; die Zähler bleiben erhalten."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Zähler und aktuelle Größe des Caches."""
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions,
+                    'expirations': self._expirations, 'size': len(self._entries), 'max_size': self.max_size}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        # nur mit gehaltener Sperre aufrufen
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]  # abgelaufen: wie ein fehlender Eintrag behandeln
+            self._expirations += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value):
+        # nur mit gehaltener Sperre aufrufen
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)  # am längsten nicht benutzten Eintrag verdrängen
+            self._evictions += 1
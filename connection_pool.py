@@ -0,0 +1,168 @@
+import threading
+import time
+from exceptions import *
+
+
+class PooledConnection:
+    """Hülle um eine sqlite3-Verbindung, die beim Schließen in den Pool zurückgegeben statt geschlossen wird."""
+
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+        self.last_used = time.monotonic()
+        self.checked_out = False
+        self.unit_of_work_active = False  # solange gesetzt, werden commit()-Aufrufe zurückgehalten
+        self.rolled_back = False  # wurde innerhalb der Arbeitseinheit bereits zurückgerollt?
+
+    def __getattr__(self, name):
+        # alle übrigen Attribute (cursor, execute, ...) an die echte Verbindung weiterreichen
+        return getattr(self._connection, name)
+
+    def commit(self):
+        """Transaktion bestätigen; innerhalb einer Arbeitseinheit erst an deren Ende."""
+        if not self.unit_of_work_active:
+            self._connection.commit()
+
+    def rollback(self):
+        """Transaktion zurückrollen; innerhalb einer Arbeitseinheit wird diese dadurch ungültig."""
+        if self.unit_of_work_active:
+            self.rolled_back = True
+        self._connection.rollback()
+
+    def begin_unit_of_work(self):
+        """Arbeitseinheit beginnen: alle folgenden Schreibvorgänge laufen in einer einzigen Transaktion."""
+        if self._connection.in_transaction:
+            self._connection.commit()  # nichts Fremdes in die Arbeitseinheit übernehmen
+        self._connection.execute('BEGIN IMMEDIATE;')
+        self.unit_of_work_active = True
+        self.rolled_back = False
+
+    def end_unit_of_work(self, commit: bool):
+        """Arbeitseinheit beenden und alle Änderungen gemeinsam bestätigen oder verwerfen."""
+        self.unit_of_work_active = False
+        if commit and self.rolled_back:
+            # ein Teil der Arbeitseinheit wurde bereits verworfen, der Rest darf nicht allein bestätigt werden
+            self._connection.rollback()
+            raise TransactionAbortedException('The unit of work was rolled back by one of its operations')
+        if commit:
+            self._connection.commit()
+        else:
+            self._connection.rollback()
+
+    def close(self):
+        """Verbindung an den Pool zurückgeben."""
+        if self.checked_out:
+            self._pool.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ConnectionPool:
+    """Begrenzter, threadsicherer Pool wiederverwendbarer Datenbankverbindungen."""
+
+    def __init__(self, connect, size: int = 5, idle_timeout: float = 300.0, checkout_timeout: float = 30.0):
+        if size < 1:
+            raise ValueError('The pool size must be at least 1')
+        self._connect = connect  # Funktion, die eine neue, fertig eingerichtete Verbindung zurückgibt
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self._idle = []  # freie Verbindungen, zuletzt zurückgegebene am Ende
+        self._open_count = 0  # Anzahl aller geöffneten Verbindungen (frei + ausgeliehen)
+        self._condition = threading.Condition()
+        self._stats = {'checkouts': 0, 'waits': 0, 'opens': 0, 'closes': 0, 'timeouts': 0}
+
+    def checkout(self) -> PooledConnection:
+        """Freie Verbindung ausleihen, bei Bedarf eine neue öffnen oder auf eine Rückgabe warten."""
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._condition:
+            self._close_expired()
+            waited = False
+            while not self._idle and self._open_count >= self.size:
+                remaining = deadline - time.monotonic()
+                if not waited:
+                    self._stats['waits'] += 1
+                    waited = True
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    self._stats['timeouts'] += 1
+                    raise ConnectionPoolExhaustedException(
+                        f'No database connection became available within {self.checkout_timeout} seconds')
+            if self._idle:
+                connection = self._idle.pop()  # zuletzt genutzte Verbindung bevorzugen (noch "warm")
+            else:
+                # Platz reservieren, bevor die Verbindung außerhalb der Sperre geöffnet wird
+                self._open_count += 1
+                connection = None
+            self._stats['checkouts'] += 1
+
+        if connection is None:
+            try:
+                connection = PooledConnection(self, self._connect())
+            except BaseException:
+                with self._condition:
+                    self._open_count -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._stats['opens'] += 1
+        connection.checked_out = True
+        return connection
+
+    def release(self, connection: PooledConnection):
+        """Ausgeliehene Verbindung zurücknehmen; offene Transaktionen werden zurückgerollt."""
+        connection.checked_out = False
+        connection.unit_of_work_active = False
+        try:
+            if connection.in_transaction:
+                connection.rollback()  # keine halbfertigen Transaktionen an den nächsten Nutzer weitergeben
+        except Exception:
+            # unbrauchbare Verbindung verwerfen statt sie wieder auszugeben
+            self._discard(connection)
+            return
+        connection.last_used = time.monotonic()
+        with self._condition:
+            self._idle.append(connection)
+            self._close_expired()
+            self._condition.notify()
+
+    def close_all(self):
+        """Alle freien Verbindungen schließen; ausgeliehene werden bei ihrer Rückgabe weiterverwendet."""
+        with self._condition:
+            while self._idle:
+                self._close(self._idle.pop())
+
+    def stats(self) -> dict:
+        """Kennzahlen des Pools (Ausleihen, Wartevorgänge, Öffnungen, ...) zurückgeben."""
+        with self._condition:
+            stats = dict(self._stats)
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._open_count - len(self._idle)
+            stats['size'] = self.size
+        return stats
+
+    def _close_expired(self):
+        """Verbindungen schließen, die länger als idle_timeout unbenutzt waren (Sperre muss gehalten werden)."""
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        expired = [connection for connection in self._idle if now - connection.last_used > self.idle_timeout]
+        for connection in expired:
+            self._idle.remove(connection)
+            self._close(connection)
+
+    def _close(self, connection: PooledConnection):
+        self._open_count -= 1
+        self._stats['closes'] += 1
+        try:
+            connection._connection.close()
+        except Exception:
+            pass
+
+    def _discard(self, connection: PooledConnection):
+        with self._condition:
+            self._close(connection)
+            self._condition.notify()
@@ -1,94 +1,521 @@
 from value_objects import *
 from exceptions import *
+from contextlib import contextmanager
+from prefix_index import PrefixIndex
+from cache import LRUCache
 import database
+import normalization
+import threading
 import time
 
+_unit_of_work = threading.local()  # Verbindung der laufenden Arbeitseinheit, getrennt pro Thread
+_prefix_index = None  # Namensindex für die Autovervollständigung, wird beim ersten Zugriff aufgebaut
+_prefix_index_lock = threading.Lock()
+# Read-through-Caches, zugleich Identity Maps: pro ID wird dasselbe Objekt zurückgegeben, bis es invalidiert oder
+# verdrängt wird, egal ob über get_person_by_id, als Mitglied einer ContactGroup oder über person.groups. Der
+# Gruppen-Cache enthält die ContactGroups nach group_id und die Liste von get_all_contact_groups.
+_person_cache = LRUCache(max_size=1000, ttl=300.0)
+_contact_group_cache = LRUCache(max_size=200, ttl=300.0)
+_data_version = None  # Stand der Datenbank (database.get_data_version), auf dem Caches und Namensindex beruhen
+
+
+@contextmanager
+def transaction():
+    """Arbeitseinheit: alle Schreibvorgänge innerhalb des with-Blocks werden in einer einzigen Transaktion
+    gemeinsam bestätigt oder bei einer Exception gemeinsam verworfen. Verschachtelte Aufrufe laufen in der äußeren
+    Arbeitseinheit mit."""
+    if getattr(_unit_of_work, 'db', None) is not None:
+        yield
+        return
+    db = database.get_db()
+    committed = False
+    _unit_of_work.original_ids = []  # IDs vor dem Speichern, siehe _remember_ids
+    try:
+        with _own_writes(db):
+            # commit()-Aufrufe der database-Funktionen werden ab jetzt zurückgehalten
+            database.retry_on_busy(db.begin_unit_of_work)
+            _unit_of_work.db = db
+            try:
+                yield
+            except BaseException:
+                db.end_unit_of_work(commit=False)  # alle Änderungen der Arbeitseinheit verwerfen
+                raise
+            db.end_unit_of_work(commit=True)
+            committed = True
+    finally:
+        if not committed:
+            # innerhalb der Arbeitseinheit vergebene IDs verweisen auf verworfene Zeilen; SQLite würde sie erneut
+            # vergeben, ein späteres Speichern der Objekte überschriebe dann fremde Einträge
+            database.restore_ids(_unit_of_work.original_ids)
+            _reset_prefix_index()  # der Index enthält evtl. verworfene Änderungen und wird neu aufgebaut
+            _person_cache.clear()  # ebenso die innerhalb der Arbeitseinheit gecachten Objekte
+            _contact_group_cache.clear()
+        _unit_of_work.db = None
+        _unit_of_work.original_ids = None
+        db.close()
+
+
+@contextmanager
+def _connection():
+    """Verbindung der laufenden Arbeitseinheit oder, außerhalb einer solchen, die Schreibverbindung aus dem Pool."""
+    db = getattr(_unit_of_work, 'db', None)
+    if db is not None:
+        yield db
+        return
+    db = database.get_db()  # Datenbankverbindung holen, um SQL-Anfragen auf der Datenbank auszuführen.
+    try:
+        with _own_writes(db):
+            yield db
+    finally:
+        db.close()  # in jedem Fall Datenbankverbindung wieder an den Pool zurückgeben
+
+
+@contextmanager
+def _own_writes(db):
+    """Schreibvorgänge dieses Prozesses auf der Schreibverbindung db als bekannt vermerken, damit _validate_caches
+    danach nicht alles verwirft: die Caches werden bei eigenen Änderungen bereits gezielt invalidiert.
+
+    Die Schreibverbindung bemerkt nur Commits anderer Verbindungen (die Leseverbindungen schreiben nie). Bleibt ihr
+    Zähler unverändert und waren vorher keine fremden Änderungen offen, stammt der neue Stand allein von uns. Die
+    Reihenfolge der Abfragen stellt sicher, dass ein fremder Commit dazwischen immer bemerkt wird."""
+    global _data_version
+    connection_data_version = database.get_connection_data_version(db)
+    data_version_before = database.get_data_version()
+    try:
+        yield
+    finally:
+        data_version_after = database.get_data_version()
+        if data_version_before == _data_version \
+                and database.get_connection_data_version(db) == connection_data_version:
+            _data_version = data_version_after
+
+
+@contextmanager
+def _read_connection():
+    """Verbindung der laufenden Arbeitseinheit (sieht deren noch unbestätigte Änderungen) oder, außerhalb einer
+    solchen, eine schreibgeschützte Verbindung aus dem Pool."""
+    db = getattr(_unit_of_work, 'db', None)
+    if db is not None:
+        yield db
+        return
+    db = database.get_read_db()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _remember_ids(persons=(), contact_groups=()):
+    """Innerhalb einer Arbeitseinheit die IDs der Objekte vor dem Speichern merken, damit transaction sie bei einem
+    Rollback wiederherstellen kann; außerhalb stellen die database-Funktionen sie selbst wieder her."""
+    original_ids = getattr(_unit_of_work, 'original_ids', None)
+    if getattr(_unit_of_work, 'db', None) is None or original_ids is None:
+        return
+    original_ids += database.get_assigned_ids(persons)
+    original_ids += [(contact_group, 'group_id', contact_group.group_id) for contact_group in contact_groups]
+
+
+def _validate_caches():
+    """Caches und Namensindex verwerfen, wenn seit der letzten Prüfung eine andere Verbindung, z. B. ein anderer
+    Prozess, die Datenbank geändert hat; andernfalls kostet die Prüfung nur ein PRAGMA."""
+    global _data_version
+    data_version = database.get_data_version()
+    if data_version != _data_version:
+        _person_cache.clear()
+        _contact_group_cache.clear()
+        _reset_prefix_index()
+        _data_version = data_version
+
+
+def get_data_version() -> tuple:
+    """Kennwert für den Stand der Datenbank, der sich bei jeder bestätigten Änderung ändert, egal von welchem Prozess
+    (siehe database.get_data_version); z. B. um eine Anzeige nur neu aufzubauen, wenn sich etwas geändert hat."""
+    return database.get_data_version()
+
 
 def save(entity):
-    """Speichern oder Aktualisieren eines PersonVO- oder ContactGroupVO-Objekts in der Datenbank."""
+    """Speichern oder Aktualisieren eines PersonVO- oder ContactGroupVO-Objekts in der Datenbank. Gibt die ID zurück."""
     if type(entity) == PersonVO:
-        db = database.get_db()  # Datenbankverbindung holen, um SQL-Anfragen auf der Datenbank auszuführen.
+        entity.modification_date = int(time.time())  # Zeitstempel für letzte Änderung aktualisieren
+        _remember_ids(persons=[entity])
         try:
-            entity.modification_date = int(
-                time.time())  # Zeitstempel für letzte Änderung aktualisieren  # TODO: das in update_person() integrieren
-            database.update_person(db, entity)  # wirft eine NoSuchEntityException,
-            # wenn Person noch nicht in der Datenbank existiert.
-        except NoSuchEntityException:
-            person_id = database.insert_person(db, entity)  # Existiert die Person noch nicht in der Datenbank,
-            # wird sie erstmalig eingefügt.
-            return person_id
+            with _connection() as db:
+                # eine einzige Upsert-Anweisung, egal ob die Person schon in der Datenbank existiert
+                person_id = database.upsert_person(db, entity)
         finally:
-            db.close()
+            _invalidate_person(entity)  # auch nach einem Fehler, das Objekt weicht dann von der Datenbank ab
+        if _prefix_index is not None:
+            _prefix_index.add(_person_summary(entity))
+        return person_id
 
     elif type(entity) == ContactGroupVO:
-        db = database.get_db()  # Datenbankverbindung holen, um SQL-Anfragen auf der Datenbank auszuführen.
+        _remember_ids(contact_groups=[entity])
         try:
-            database.update_contact_group(db, entity)  # wirft eine NoSuchEntityException,
-            # wenn ContactGroup noch nicht in der Datenbank existiert.
-        except NoSuchEntityException:
-            group_id = database.insert_contact_group(db, entity)  # Existiert die ContactGroup noch nicht in der
-            # Datenbank, wird sie erstmalig eingefügt.
-            return group_id
-
+            with _connection() as db:
+                # eine einzige Upsert-Anweisung, egal ob die ContactGroup schon in der Datenbank existiert
+                return database.upsert_contact_group(db, entity)
         finally:
-            db.close()  # in jedem Fall Datenbankverbindung wieder schließen
+            _invalidate_contact_group(entity)
     else:
         # Exception werfen, wenn Typ des Objekts in der Parameterliste nicht unterstützt wird
         raise IllegalEntityTypeException('The entity must be of one of the following types: PersonVO or ' +
                                          'ContactGroupVO')
 
 
+def save_many(persons: [PersonVO]):
+    """Speichern vieler PersonVO-Objekte; neue Personen werden gesammelt in einer Transaktion eingefügt."""
+    if not all(type(person) == PersonVO for person in persons):
+        # Exception werfen, wenn ein Objekt in der Liste keine Person ist
+        raise IllegalEntityTypeException('All entities must be of type PersonVO')
+    new_persons = [person for person in persons if person.person_id is None]
+    saved_persons = [person for person in persons if person.person_id is not None]
+    with transaction(), _connection() as db:
+        _remember_ids(persons=new_persons)
+        database.insert_persons_bulk(db, new_persons)  # neue Personen gebündelt einfügen
+        # neue Personen sind noch nicht im Cache, aber in Gruppen eingetragen; statt jede Gruppe einzeln zu prüfen,
+        # werden bei einem Massenimport alle gecachten Gruppen verworfen
+        _contact_group_cache.clear()
+        if _prefix_index is not None:
+            _prefix_index.add_many(_person_summary(person) for person in new_persons)
+        for person in saved_persons:
+            save(person)  # bereits gespeicherte Personen einzeln aktualisieren
+    return [person.person_id for person in persons]
+
+
 def delete(entity):
     """Löschen einer Person oder einer ContactGroup aus der Datenbank bewirken."""
     if type(entity) == PersonVO:
-        db = database.get_db()
-        database.delete_person(db, entity)  # löschen der Person in der Datenbank
-        db.close()
+        with _connection() as db:
+            database.delete_person(db, entity)  # löschen der Person in der Datenbank
+        _invalidate_person(entity)
+        if _prefix_index is not None:
+            _prefix_index.remove(entity.person_id)
     elif type(entity) == ContactGroupVO:
-        db = database.get_db()
-        database.delete_contact_group(db, entity)  # löschen der ContactGroup in der Datenbank
-        db.close()
+        with _connection() as db:
+            database.delete_contact_group(db, entity)  # löschen der ContactGroup in der Datenbank
+        _invalidate_contact_group(entity)
     else:
         # Exception werfen, wenn der Typ des Objekts in der Parameterliste nicht unterstützt wird
         raise IllegalEntityTypeException('The entity must be of one of the following types: PersonVO or ' +
                                          'ContactGroupVO')
 
 
-def get_all_persons():
-    """Holen aller Personen aus der Datenbank."""
-    db = database.get_db()
-    all_persons = database.get_all_persons(db)  # Alle Personen aus der Datenbank erhalten
-    db.close()
-    return all_persons
+def get_all_persons(lazy=False):
+    """Holen aller Personen aus der Datenbank; mit lazy=True werden Gruppen, Adressen, Telefonnummern und
+    benutzerdefinierte Felder erst beim ersten Zugriff geladen (siehe prefetch). Die Personen sind eigene Objekte,
+    nicht die der Identity Map: alle Kontakte passen nicht in den begrenzten Cache."""
+    with _read_connection() as db:
+        if lazy:
+            return database.load_persons(db, lazy_loader=_load_collection)
+        return database.get_all_persons(db)  # Alle Personen aus der Datenbank erhalten
+
+
+def get_contact_group_by_id(group_id) -> ContactGroupVO:
+    """Holen der ContactGroup mit ihren Mitgliedern aus der Datenbank; deren Adressen, Telefonnummern,
+    benutzerdefinierte Felder und Gruppen werden erst beim ersten Zugriff geladen."""
+    def load_contact_group():
+        with _read_connection() as db:
+            # entsprechende ContactGroup aus der Datenbank holen
+            return database.get_contact_group_by_group_id(db, group_id, lazy_loader=_load_collection)
+
+    _validate_caches()
+    return _cached_contact_group(group_id, load_contact_group)
 
 
 def get_persons_by_contact_group(contact_group: ContactGroupVO):
     """Holen aller Personen einer ContactGroup aus der Datenbank."""
-    db = database.get_db()
     if not contact_group.group_id:  # Sicherstellen, dass group_id für die spätere SQL-Anfrage gesetzt ist
         raise NoSuchEntityException('Please specify an existing contact_group')
-    contact_group = database.get_contact_group_by_group_id(contact_group.group_id)  # entsprechende ContactGroup aus
-    # der Datenbank holen
-    persons = contact_group.persons  # Personen aus der ContactGroup extrahieren
-    db.close()
+    contact_group = get_contact_group_by_id(contact_group.group_id)
+    # Personen aus der ContactGroup extrahieren; Kopie der gecachten Liste, damit Aufrufer sie verändern dürfen
+    persons = list(contact_group.persons)
+    prefetch(persons, *PersonVO.COLLECTIONS[1:])  # Gruppen der Mitglieder erst bei Bedarf
     return persons
 
 
-def get_all_contact_groups():
-    """Holen aller ContactGroups aus der Datenbank."""
-    db = database.get_db()
-    all_contact_groups = database.get_all_contact_groups(db)  # passende Funktion auf database aufrufen
-    db.close()
-    return all_contact_groups
+def get_all_contact_groups(summary_only=False):
+    """Holen aller ContactGroups aus der Datenbank; mit summary_only=True werden Adressen, Telefonnummern und
+    benutzerdefinierte Felder der Mitglieder erst beim ersten Zugriff geladen (z. B. für Listenansichten)."""
+    def load_contact_groups():
+        with _read_connection() as db:
+            contact_groups = database.get_all_contact_groups(db, lazy_loader=_load_collection)
+        # bereits gecachte Gruppen übernehmen, die übrigen eintragen
+        return [_cached_contact_group(contact_group.group_id, lambda: contact_group)
+                for contact_group in contact_groups]
 
+    _validate_caches()
+    # Kopie der gecachten Liste zurückgeben, damit Aufrufer sie verändern dürfen
+    contact_groups = list(_contact_group_cache.get_or_load('all', load_contact_groups))
+    if not summary_only:
+        prefetch([person for contact_group in contact_groups for person in contact_group.persons],
+                 *PersonVO.COLLECTIONS[1:])
+    return contact_groups
+
+
+def get_contact_groups_without_members() -> [ContactGroupVO]:
+    """Alle ContactGroups ohne Mitglieder holen (nur ID und Titel, nicht gecacht); die Objekte gehören dem Aufrufer,
+    Personen dürfen ihnen also hinzugefügt werden."""
+    with _read_connection() as db:
+        return database.get_contact_groups_without_members(db)
+
+
+def get_person_summaries() -> [PersonSummaryVO]:
+    """Kurzfassungen (ID, Namen, Änderungsdatum) aller Personen holen, sortiert nach Nachname und Vorname."""
+    with _read_connection() as db:
+        return database.get_person_summaries(db)
+
+
+def get_person_page(contact_group: ContactGroupVO = None, after_key: tuple = None, limit: int = 100):
+    """Eine Seite der Personenliste (alle Personen oder die Mitglieder einer ContactGroup) als PersonSummaryVOs holen,
+    sortiert nach Nachname und Vorname. Gibt die Personen und den after_key für die nächste Seite zurück (None nach
+    der letzten Seite)."""
+    if contact_group is not None and not contact_group.group_id:
+        raise NoSuchEntityException('Please specify an existing contact_group')
+    with _read_connection() as db:
+        return database.get_person_page(db, contact_group.group_id if contact_group is not None else None,
+                                        after_key, limit)
+
+
+def get_recently_modified(since: int, limit: int = 100, after_key: tuple = None):
+    """Kurzfassungen der seit since (Unix-Zeit) geänderten Personen holen, die zuletzt geänderten zuerst. Gibt die
+    Personen und den after_key für die nächste Seite zurück (None nach der letzten Seite; limit=None für alle)."""
+    with _read_connection() as db:
+        return database.get_recently_modified(db, since, after_key, limit)
+
+
+def get_person_summaries_by_ids(person_ids: [int], contact_group: ContactGroupVO = None) -> [PersonSummaryVO]:
+    """Kurzfassungen der Personen mit diesen IDs in der gegebenen Reihenfolge holen (z. B. für Suchergebnisse),
+    optional nur der Mitglieder einer ContactGroup. Nicht (mehr) existierende IDs werden übergangen."""
+    with _read_connection() as db:
+        return database.get_person_summaries_by_ids(db, person_ids,
+                                                    contact_group.group_id if contact_group is not None else None)
+
+
+def get_member_ids(contact_group: ContactGroupVO) -> set:
+    """IDs der Mitglieder einer ContactGroup, ohne die Personen zu laden (z. B. um Suchtreffer zu filtern)."""
+    with _read_connection() as db:
+        return database.get_member_ids(db, contact_group.group_id)
+
+
+def get_person_by_id(person_id, lazy=False):
+    """Holen der Person aus der Datenbank; mit lazy=True werden die Kind-Sammlungen erst beim ersten Zugriff
+    geladen."""
+    def load_person():
+        with _read_connection() as db:
+            # passende Funktion auf database aufrufen
+            person = database.get_person_by_id(db, person_id, _load_collection if lazy else None)
+        if person.is_loaded('groups'):
+            _use_cached_contact_groups(person)
+        return person
+
+    _validate_caches()
+    # eine bereits gecachte Person wird unabhängig von lazy zurückgegeben, es gibt nur ein Objekt pro ID
+    return _person_cache.get_or_load(person_id, load_person)
+
+
+def prefetch(persons: [PersonVO], *collections: str):
+    """Hinweis, dass die Kind-Sammlungen collections (Namen aus PersonVO.COLLECTIONS, ohne Angabe alle) für viele
+    verzögert geladene Personen gebraucht werden: sie werden gemeinsam mit einer Abfrage je Sammlung geladen statt
+    einzeln beim ersten Zugriff. Bereits geladene Sammlungen bleiben unverändert."""
+    for collection in collections or PersonVO.COLLECTIONS:
+        pending_persons = {person.person_id: person for person in persons if not person.is_loaded(collection)}
+        if pending_persons:
+            _load_collections(pending_persons, collection)
+
+
+def _load_collection(person: PersonVO, collection: str):
+    """Loader verzögert geladener Personen: eine Kind-Sammlung einer Person beim ersten Zugriff holen."""
+    _load_collections({person.person_id: person}, collection)
+
+
+def _load_collections(persons: dict, collection: str):
+    """Kind-Sammlung collection der Personen in persons (person_id -> PersonVO) laden; geladene Gruppen werden durch
+    die gecachten ContactGroups ersetzt, sofern vorhanden."""
+    with _read_connection() as db:
+        database.load_person_collections(db, persons, (collection,))
+    if collection == 'groups':
+        for person in persons.values():
+            _use_cached_contact_groups(person)
+
+
+def _cached_contact_group(group_id, load) -> ContactGroupVO:
+    """ContactGroup aus dem Cache oder mit load() laden und eintragen (Read-through wie LRUCache.get_or_load). Die
+    Mitglieder einer neu geladenen Gruppe werden durch die gecachten Personen ersetzt bzw. selbst gecacht, und in
+    deren geladenen groups verweist der Eintrag für diese Gruppe danach auf sie."""
+    loaded_contact_groups = []
+
+    def load_contact_group():
+        contact_group = load()
+        contact_group.persons = [_person_cache.get_or_load(person.person_id, lambda: person)
+                                 for person in contact_group.persons]
+        loaded_contact_groups.append(contact_group)
+        return contact_group
+
+    cached_contact_group = _contact_group_cache.get_or_load(group_id, load_contact_group)
+    if loaded_contact_groups and cached_contact_group is loaded_contact_groups[0]:
+        # neu eingetragen (nicht schon vorhanden oder von einem anderen Thread eingetragen)
+        for person in cached_contact_group.persons:
+            if person.is_loaded('groups'):
+                _replace_contact_group(person, cached_contact_group)
+    return cached_contact_group
+
+
+def _use_cached_contact_groups(person: PersonVO):
+    """Einträge in person.groups durch die gecachten ContactGroups mit derselben ID ersetzen."""
+    for contact_group in list(person.groups):
+        cached_contact_group = _contact_group_cache.peek(contact_group.group_id)
+        if cached_contact_group is not None and cached_contact_group is not contact_group:
+            _replace_contact_group(person, cached_contact_group)
+
+
+def _replace_contact_group(person: PersonVO, contact_group: ContactGroupVO):
+    """contact_group anstelle eines anderen Objekts mit derselben ID in person.groups eintragen."""
+    for group in [group for group in person.groups if group.group_id == contact_group.group_id]:
+        if group is not contact_group:
+            person.remove(group)  # entfernt die Person auch aus diesem (nicht mehr verwendeten) Gruppenobjekt
+    if not person.entity_already_added(contact_group):
+        person.add(contact_group)
+
+
+def search(query: str, limit: int = 50) -> [int]:
+    """Volltextsuche über Namen, Adressen, Telefonnummern und benutzerdefinierte Felder; gibt die IDs der
+    gefundenen Personen sortiert nach Relevanz zurück."""
+    with _read_connection() as db:
+        return database.search_persons(db, query, limit)
+
+
+def fuzzy_search(query: str, limit: int = 20, threshold: float = 0.6) -> [int]:
+    """Fehlertolerante Suche nach Vor- und Nachnamen (Meier/Maier/Meyer, Müller/Mueller); gibt die IDs der Personen
+    mit einer Ähnlichkeit von mindestens threshold zurück, die ähnlichsten zuerst."""
+    normalized_query = normalization.normalize_name(query)
+    with _read_connection() as db:
+        # Vorauswahl über den Trigramm-Index, danach genaue Bewertung nur der Kandidaten
+        candidates = database.get_name_trigram_candidates(db, normalization.trigrams(normalized_query),
+                                                          limit=max(200, limit * 10))
+    scored_ids = []
+    for person_id, first_name, last_name in candidates:
+        first_name, last_name = normalization.normalize_name(first_name), normalization.normalize_name(last_name)
+        # mehrteilige Anfragen mit dem vollen Namen (in beiden Reihenfolgen) vergleichen, sonst mit Vor- und Nachname
+        if ' ' in normalized_query:
+            names = (f'{first_name} {last_name}', f'{last_name} {first_name}')
+        else:
+            names = (first_name, last_name)
+        score = max(normalization.similarity_at_least(normalized_query, name, threshold) for name in names)
+        if score >= threshold:
+            scored_ids.append((score, person_id))
+    scored_ids.sort(key=lambda scored_id: scored_id[0], reverse=True)
+    return [person_id for score, person_id in scored_ids[:limit]]
+
+
+def find_by_phone(number: str) -> [int]:
+    """Rückwärtssuche: IDs der Personen mit dieser Telefonnummer, unabhängig von ihrer Schreibweise und von
+    nationaler oder internationaler Vorwahl; exakte Treffer zuerst, danach Treffer über die Endziffern."""
+    with _read_connection() as db:
+        return database.find_person_ids_by_phone(db, number)
+
+
+def find_by_email(address: str) -> [int]:
+    """IDs der Personen, denen diese E-Mail-Adresse gehört (ohne Beachtung der Groß-/Kleinschreibung)."""
+    with _read_connection() as db:
+        return database.find_person_ids_by_email(db, address)
+
+
+def find_by_domain(domain: str) -> [int]:
+    """IDs aller Personen mit einer E-Mail-Adresse in dieser Domain (einschließlich Subdomains)."""
+    with _read_connection() as db:
+        return database.find_person_ids_by_domain(db, domain)
+
+
+def autocomplete(prefix: str, limit: int = None) -> [int]:
+    """IDs der Personen, deren Vor- oder Nachname mit prefix beginnt (alphabetisch); wird aus dem Speicher
+    beantwortet, ohne Datenbankabfrage."""
+    return _get_prefix_index().search(prefix, limit)
+
+
+def autocomplete_summaries(prefix: str, limit: int = None) -> [PersonSummaryVO]:
+    """Wie autocomplete, aber mit den Kurzfassungen der Personen für Listenansichten, ebenfalls ohne
+    Datenbankabfrage."""
+    return _get_prefix_index().search_summaries(prefix, limit)
+
+
+def get_indexed_person_summaries(person_ids: [int]) -> [PersonSummaryVO]:
+    """Kurzfassungen der Personen mit diesen IDs (z. B. Treffer der Volltextsuche) in der gegebenen Reihenfolge aus dem
+    Namensindex, ohne Datenbankabfrage; nicht (mehr) existierende IDs werden übergangen."""
+    return _get_prefix_index().get_summaries(person_ids)
+
+
+def _get_prefix_index() -> PrefixIndex:
+    """Namensindex zurückgeben und beim ersten Aufruf (oder nach fremden Änderungen) mit einer einzigen Abfrage
+    aufbauen."""
+    global _prefix_index
+    _validate_caches()
+    if _prefix_index is None:
+        with _prefix_index_lock:
+            if _prefix_index is None:  # erneut prüfen, ein anderer Thread könnte den Index inzwischen aufgebaut haben
+                with _read_connection() as db:
+                    _prefix_index = PrefixIndex(database.get_person_summaries(db))
+    return _prefix_index
+
+
+def _person_summary(person: PersonVO) -> PersonSummaryVO:
+    """Kurzfassung einer gerade gespeicherten Person für den Namensindex, wie sie database.get_person_summaries
+    liefern würde."""
+    sort_key = normalization.person_sort_key(person.last_name, person.first_name)
+    return PersonSummaryVO(person.person_id, person.last_name, person.first_name, person.modification_date,
+                           (sort_key, person.person_id))
+
+
+def _reset_prefix_index():
+    """Namensindex verwerfen; er wird beim nächsten Zugriff neu aufgebaut."""
+    global _prefix_index
+    _prefix_index = None
+
+
+def invalidate(entity):
+    """Gecachtes PersonVO- oder ContactGroupVO-Objekt verwerfen, z. B. wenn es verändert, aber nicht gespeichert
+    wurde; der nächste Zugriff lädt es neu aus der Datenbank."""
+    if type(entity) == PersonVO:
+        _invalidate_person(entity)
+    elif type(entity) == ContactGroupVO:
+        _invalidate_contact_group(entity)
+    else:
+        # Exception werfen, wenn der Typ des Objekts in der Parameterliste nicht unterstützt wird
+        raise IllegalEntityTypeException('The entity must be of one of the following types: PersonVO or ' +
+                                         'ContactGroupVO')
+
+
+def _invalidate_person(person: PersonVO):
+    """Person und die gecachten ContactGroups verwerfen, in denen sie vor oder nach der Änderung Mitglied ist: vorher
+    laut den gecachten Gruppen, nachher laut person.groups."""
+    _person_cache.pop(person.person_id)
+    group_ids = {group.group_id for group in person.groups} if person.is_loaded('groups') else set()
+    # Listen aller Gruppen (keine ContactGroupVO) enthalten jede Gruppe und werden immer verworfen
+    _contact_group_cache.discard_where(
+        lambda key, value: type(value) != ContactGroupVO or key in group_ids
+        or any(member.person_id == person.person_id for member in value.persons))
+
+
+def _invalidate_contact_group(contact_group: ContactGroupVO):
+    """ContactGroup, die Listen aller Gruppen und die gecachten Personen verwerfen, die laut Cache oder laut
+    contact_group.persons Mitglied der Gruppe sind."""
+    _contact_group_cache.discard_where(
+        lambda key, value: type(value) != ContactGroupVO or key == contact_group.group_id)
+    member_ids = {person.person_id for person in contact_group.persons}
+    _person_cache.discard_where(
+        lambda person_id, person: person_id in member_ids
+        or (person.is_loaded('groups') and any(group.group_id == contact_group.group_id for group in person.groups)))
+
+
+def configure_cache(max_size=1000, ttl=300.0, contact_group_max_size=200):
+    """Caches mit neuen Grenzen (Anzahl der Einträge, Gültigkeit in Sekunden) neu anlegen; verwirft alle Einträge."""
+    global _person_cache, _contact_group_cache
+    _person_cache = LRUCache(max_size, ttl)
+    _contact_group_cache = LRUCache(contact_group_max_size, ttl)
 
-def get_person_by_id(person_id):
-    """Holen der Person aus der Datenbank."""
-    db = database.get_db()
-    person = database.get_person_by_id(db, person_id)  # passende Funktion auf database aufrufen
-    db.close()
-    return person
 
+def get_cache_stats() -> dict:
+    """Treffer, Fehlschläge, Verdrängungen, abgelaufene Einträge und Größe beider Caches."""
+    return {'person': _person_cache.stats(), 'contact_group': _contact_group_cache.stats()}
 
 if __name__ == '__main__':
     # Es folgen Anweisunge
@@ -1,32 +1,145 @@
+import pathlib
 import sqlite3
+import threading
 from value_objects import *
 from exceptions import *
+from connection_pool import ConnectionPool
+from normalization import sql_fold_umlauts, normalize_phone_number, normalize_email, reversed_email_domain, \
+    person_sort_key, PHONE_SUFFIX_LENGTH
+from types import SimpleNamespace
 from faker import Faker
 from faker.providers import phone_number
 import time
 
+DB_NAME = 'contact_book_db.sqlite'
+BUSY_TIMEOUT = 5.0  # Sekunden, die SQLite auf eine Sperre wartet, bevor SQLITE_BUSY gemeldet wird
+
+_pool = None  # Pool mit der einen Schreibverbindung, wird beim ersten get_db()-Aufruf erstellt
+_read_pool = None  # Pool mit schreibgeschützten Verbindungen für Abfragen
+_pool_lock = threading.Lock()
+_watch_db = None  # eigene Verbindung, die nur PRAGMA data_version abfragt (siehe get_data_version)
+_watch_generation = 0  # zählt neu geöffnete Überwachungsverbindungen, ihre Zählerstände sind nicht vergleichbar
+_watch_lock = threading.Lock()
+
 
 # TODO: Datentypen hinzufügen? => Prof. Preuss fragen...
 # TODO: Beziehungen hinzufügen! => nochmal überprüfen...
 
-def setup(db_name='contact_book_db.sqlite'):
-    """Datenbanktabellen erstellen, wenn nicht schon geschehen und Rückgabe der Datenbankverbindung."""
-    db = sqlite3.connect(db_name)
+def setup(db_name=DB_NAME, busy_timeout=BUSY_TIMEOUT):
+    """Schreibverbindung öffnen, WAL-Modus aktivieren, Schema bei Bedarf migrieren und Rückgabe der
+    Datenbankverbindung."""
+    # Verbindungen aus dem Pool werden von mehreren Threads (GUI, Import, Export) genutzt
+    db = sqlite3.connect(db_name, check_same_thread=False)
+    db.execute(f'PRAGMA busy_timeout = {int(busy_timeout * 1000)};')
+    # im WAL-Modus blockieren Leser den Schreiber nicht und umgekehrt (Einstellung bleibt in der Datei gespeichert)
+    retry_on_busy(lambda: db.execute('PRAGMA journal_mode = WAL;'))
+    db.execute('PRAGMA synchronous = NORMAL;')  # im WAL-Modus ausreichend sicher und deutlich schneller
     db.execute('PRAGMA foreign_keys = ON;')  # cascadierendes löschen ermöglichen
     db.commit()
-    # Tabellen erstellen
-    create_person_table(db)
-    create_contact_group_table(db)
-    create_belongs_to_table(db)
-    create_address_table(db)
-    create_cell_number_field_table(db)
-    create_custom_field_table(db)
+    migrate(db)  # Schema nur anpassen, wenn die Datei noch nicht auf dem neuesten Stand ist
+    return db
+
+
+def setup_read_only(db_name=DB_NAME, busy_timeout=BUSY_TIMEOUT):
+    """Schreibgeschützte Datenbankverbindung für Abfragen öffnen."""
+    uri = pathlib.Path(db_name).resolve().as_uri() + '?mode=ro'
+    db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    db.execute(f'PRAGMA busy_timeout = {int(busy_timeout * 1000)};')
     return db
 
 
+def retry_on_busy(operation, attempts=5, delay=0.05):
+    """Operation bei SQLITE_BUSY ("database is locked") mit exponentiell wachsender Wartezeit wiederholen."""
+    for attempt in range(attempts):
+        try:
+            return operation()
+        except sqlite3.OperationalError as err:
+            message = str(err)
+            if attempt == attempts - 1 or ('locked' not in message and 'busy' not in message):
+                raise
+            time.sleep(delay * 2 ** attempt)
+
+
+def configure_pool(db_name=DB_NAME, size=5, idle_timeout=300.0, checkout_timeout=30.0, busy_timeout=BUSY_TIMEOUT):
+    """Verbindungspools (neu) einrichten: eine Schreibverbindung und bis zu size schreibgeschützte Verbindungen.
+    Freie Verbindungen bestehender Pools werden geschlossen."""
+    global _pool, _read_pool
+    with _pool_lock:
+        if _pool:
+            _pool.close_all()
+            _read_pool.close_all()
+        _pool, _read_pool = _create_pools(db_name, size, idle_timeout, checkout_timeout, busy_timeout)
+        _open_watch_connection(db_name, busy_timeout)
+        return _pool
+
+
+def _create_pools(db_name=DB_NAME, size=5, idle_timeout=300.0, checkout_timeout=30.0, busy_timeout=BUSY_TIMEOUT):
+    # alle Schreibvorgänge werden über eine einzige Verbindung serialisiert
+    write_pool = ConnectionPool(lambda: setup(db_name, busy_timeout), size=1, idle_timeout=idle_timeout,
+                                checkout_timeout=checkout_timeout)
+    # die Schreibverbindung einmal öffnen, damit Datei, WAL-Modus und Schema existieren, bevor gelesen wird
+    write_pool.checkout().close()
+    read_pool = ConnectionPool(lambda: setup_read_only(db_name, busy_timeout), size=size,
+                               idle_timeout=idle_timeout, checkout_timeout=checkout_timeout)
+    return write_pool, read_pool
+
+
+def get_pool() -> ConnectionPool:
+    """Pool der Schreibverbindung zurückgeben und die Pools bei Bedarf mit Standardwerten erstellen."""
+    global _pool, _read_pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:  # erneut prüfen, ein anderer Thread könnte den Pool inzwischen erstellt haben
+                _pool, _read_pool = _create_pools()
+                _open_watch_connection()
+    return _pool
+
+
+def get_read_pool() -> ConnectionPool:
+    """Pool der schreibgeschützten Verbindungen zurückgeben."""
+    get_pool()  # stellt sicher, dass beide Pools existieren
+    return _read_pool
+
+
+def _open_watch_connection(db_name=DB_NAME, busy_timeout=BUSY_TIMEOUT):
+    """Überwachungsverbindung für get_data_version (neu) öffnen."""
+    global _watch_db, _watch_generation
+    with _watch_lock:
+        if _watch_db is not None:
+            _watch_db.close()
+        _watch_db = setup_read_only(db_name, busy_timeout)
+        _watch_generation += 1
+
+
+def get_data_version() -> tuple:
+    """Kennwert für den Stand der Datenbank, der sich ändert, sobald irgendeine Verbindung (auch eines anderen
+    Prozesses) eine Änderung bestätigt hat; Werte sind nur auf Gleichheit zu vergleichen.
+
+    PRAGMA data_version ändert sich nur durch Commits anderer Verbindungen; deshalb wird es auf einer eigenen
+    Verbindung abgefragt, die selbst nie schreibt. Die Abfrage liest nur den gemeinsamen WAL-Index und ist günstig."""
+    get_pool()  # stellt sicher, dass die Überwachungsverbindung existiert
+    with _watch_lock:
+        return _watch_generation, _watch_db.execute('PRAGMA data_version;').fetchone()[0]
+
+
+def get_connection_data_version(db) -> int:
+    """PRAGMA data_version einer bestimmten Verbindung; ändert sich nur durch Commits anderer Verbindungen."""
+    return db.execute('PRAGMA data_version;').fetchone()[0]
+
+
+def get_pool_stats() -> dict:
+    """Kennzahlen der Verbindungspools (checkouts, waits, opens, ...) getrennt nach Schreib- und Lesepool."""
+    return {'write': get_pool().stats(), 'read': get_read_pool().stats()}
+
+
 def get_db():
-    """Datenbanktabellen erstellen, wenn nicht schon geschehen und Rückgabe der Datenbankverbindung."""
-    return setup()
+    """Die Schreibverbindung aus dem Pool ausleihen; db.close() gibt sie an den Pool zurück."""
+    return get_pool().checkout()
+
+
+def get_read_db():
+    """Schreibgeschützte Verbindung für Abfragen aus dem Pool ausleihen; db.close() gibt sie zurück."""
+    return get_read_pool().checkout()
 
 
 def create_person_table(db):
@@ -40,7 +153,6 @@ def create_person_table(db):
         modification_date INTEGER NOT NULL,
         birthdate INTEGER
     );''')
-    db.commit()
 
 
 def create_contact_group_table(db):
@@ -51,7 +163,6 @@ def create_contact_group_table(db):
         group_id INTEGER PRIMARY KEY NOT NULL,
         title TEXT NOT NULL
     );''')
-    db.commit()
 
 
 def create_custom_field_table(db):
@@ -68,7 +179,6 @@ def create_custom_field_table(db):
         FOREIGN KEY (person_id) REFERENCES person (person_id) ON DELETE CASCADE
 
     );''')
-    db.commit()
 
 
 def create_cell_number_field_table(db):
@@ -83,7 +193,6 @@ def create_cell_number_field_table(db):
         -- CellNumberField löschen, wenn verknüpfte Person gelöscht wird
         FOREIGN KEY (person_id) REFERENCES person (person_id) ON DELETE CASCADE
     );''')
-    db.commit()
 
 
 def create_address_table(db):
@@ -101,7 +210,6 @@ def create_address_table(db):
         -- Adresse löschen, wenn Person gelöscht wird
         FOREIGN KEY (person_id) REFERENCES person (person_id) ON DELETE CASCADE
     );''')
-    db.commit()
 
 
 def create_belongs_to_table(db):
@@ -117,7 +225,350 @@ def create_belongs_to_table(db):
         FOREIGN KEY (person_id) REFERENCES person (person_id) ON DELETE CASCADE,  
         PRIMARY KEY (group_id, person_id)
     );''')
-    db.commit()
+
+
+def create_schema(db):
+    """Migration 1: Grundschema mit allen Tabellen erstellen."""
+    create_person_table(db)
+    create_contact_group_table(db)
+    create_belongs_to_table(db)
+    create_address_table(db)
+    create_cell_number_field_table(db)
+    create_custom_field_table(db)
+
+
+def create_indexes(db):
+    """Migration 2: Indizes für die Fremdschlüssel der Kind-Tabellen und häufige Sortierungen erstellen."""
+    cursor = db.cursor()
+    # Zugriff auf die Kind-Einträge einer Person (und kaskadierendes Löschen) ohne vollständigen Tabellendurchlauf
+    cursor.execute('''CREATE INDEX IF NOT EXISTS address_person_id_index ON address (person_id);''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS cell_number_field_person_id_index
+        ON cell_number_field (person_id);''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS custom_field_person_id_index ON custom_field (person_id);''')
+    # Der Primärschlüssel (group_id, person_id) deckt nur die Suche nach Gruppen ab, dieser Index die nach Personen
+    cursor.execute('''CREATE INDEX IF NOT EXISTS belongs_to_person_id_index ON belongs_to (person_id, group_id);''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS person_modification_date_index
+        ON person (modification_date);''')
+    # Sortierschlüssel nach Nachname + Vorname (fehlende Namen werden als leere Zeichenkette einsortiert)
+    cursor.execute('''CREATE INDEX IF NOT EXISTS person_name_index
+        ON person (ifnull(last_name, ''), ifnull(first_name, ''));''')
+
+
+def person_search_rows_sql(person_ids: str) -> str:
+    """SQL, das die Suchindex-Einträge aller Personen einfügt, deren person_id die Bedingung person_ids erfüllt (z. B.
+    'BETWEEN :first_id AND :last_id'). Die Kind-Einträge werden gruppiert statt pro Person einzeln zusammengefasst."""
+    return f'''INSERT INTO person_search (rowid, first_name, last_name, address, cell_number, custom_field)
+        SELECT person.person_id, first_name, last_name, address.text, cell_number_field.text, custom_field.text
+        FROM person
+        LEFT JOIN (SELECT person_id, group_concat(ifnull(street, '') || ' ' || ifnull(house_number, '') || ' '
+            || ifnull(zip_code, '') || ' ' || ifnull(town, ''), ' ') AS text FROM address
+            WHERE person_id {person_ids} GROUP BY person_id) address ON address.person_id = person.person_id
+        LEFT JOIN (SELECT person_id, group_concat(cell_number, ' ') AS text FROM cell_number_field
+            WHERE person_id {person_ids} GROUP BY person_id) cell_number_field
+            ON cell_number_field.person_id = person.person_id
+        LEFT JOIN (SELECT person_id, group_concat(field_value, ' ') AS text FROM custom_field
+            WHERE person_id {person_ids} GROUP BY person_id) custom_field ON custom_field.person_id = person.person_id
+        WHERE person.person_id {person_ids};'''
+
+
+def person_search_row_sql(person_id: str) -> str:
+    """SQL, das den Suchindex-Eintrag einer Person (person_id als SQL-Ausdruck, z. B. NEW.person_id) neu aufbaut."""
+    return f'''DELETE FROM person_search WHERE rowid = {person_id};
+        INSERT INTO person_search (rowid, first_name, last_name, address, cell_number, custom_field)
+        SELECT person_id, first_name, last_name,
+            (SELECT group_concat(ifnull(street, '') || ' ' || ifnull(house_number, '') || ' ' || ifnull(zip_code, '')
+                || ' ' || ifnull(town, ''), ' ') FROM address WHERE address.person_id = person.person_id),
+            (SELECT group_concat(cell_number, ' ') FROM cell_number_field
+                WHERE cell_number_field.person_id = person.person_id),
+            (SELECT group_concat(field_value, ' ') FROM custom_field WHERE custom_field.person_id = person.person_id)
+        FROM person WHERE person_id = {person_id};'''
+
+
+def create_search_index(db):
+    """Migration 3: FTS5-Volltextindex über Namen, Adressen, Telefonnummern und benutzerdefinierte Felder erstellen,
+    per Trigger synchron halten und mit den vorhandenen Personen befüllen."""
+    cursor = db.cursor()
+    # ein Eintrag pro Person (rowid = person_id); Umlaute und Akzente werden beim Tokenisieren entfernt,
+    # Präfix-Indizes beschleunigen die Suche nach Wortanfängen
+    cursor.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS person_search USING fts5 (
+        first_name, last_name, address, cell_number, custom_field,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    );''')
+    cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS person_search_person_insert AFTER INSERT ON person BEGIN
+        {person_search_row_sql('NEW.person_id')}
+    END;''')
+    cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS person_search_person_update
+        AFTER UPDATE OF person_id, first_name, last_name ON person BEGIN
+        DELETE FROM person_search WHERE rowid = OLD.person_id;
+        {person_search_row_sql('NEW.person_id')}
+    END;''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS person_search_person_delete AFTER DELETE ON person BEGIN
+        DELETE FROM person_search WHERE rowid = OLD.person_id;
+    END;''')
+    # Änderungen an Kind-Einträgen bauen den Eintrag der betroffenen Person(en) neu auf
+    for table in ('address', 'cell_number_field', 'custom_field'):
+        cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS person_search_{table}_insert AFTER INSERT ON {table} BEGIN
+            {person_search_row_sql('NEW.person_id')}
+        END;''')
+        cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS person_search_{table}_update AFTER UPDATE ON {table} BEGIN
+            {person_search_row_sql('NEW.person_id')}
+        END;''')
+        # wechselt ein Eintrag die Person, muss auch der Eintrag der bisherigen Person neu aufgebaut werden
+        cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS person_search_{table}_move AFTER UPDATE OF person_id ON {table}
+            WHEN OLD.person_id != NEW.person_id BEGIN
+            {person_search_row_sql('OLD.person_id')}
+        END;''')
+        cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS person_search_{table}_delete AFTER DELETE ON {table} BEGIN
+            {person_search_row_sql('OLD.person_id')}
+        END;''')
+    # vorhandene Personen einmalig indizieren
+    cursor.execute('''DELETE FROM person_search;''')
+    cursor.execute(person_search_rows_sql('IS NOT NULL'))
+
+
+def person_name_trigram_rows_sql(person_ids: str) -> str:
+    """SQL, das die Trigramm-Einträge aller Personen einfügt, deren person_id die Bedingung person_ids erfüllt (siehe
+    person_search_rows_sql). Die Namen werden mit ausgeschriebenen Umlauten und wie in normalization.trigrams von
+    Leerzeichen umrahmt gespeichert."""
+    return f'''INSERT INTO person_name_trigram (rowid, first_name, last_name)
+        SELECT person_id, '  ' || {sql_fold_umlauts("ifnull(first_name, '')")} || ' ',
+            '  ' || {sql_fold_umlauts("ifnull(last_name, '')")} || ' '
+        FROM person WHERE person_id {person_ids};'''
+
+
+def person_name_trigram_row_sql(person_id: str) -> str:
+    """SQL, das den Trigramm-Eintrag einer Person (person_id als SQL-Ausdruck) einfügt."""
+    return person_name_trigram_rows_sql(f'= {person_id}')
+
+
+def create_name_trigram_index(db):
+    """Migration 4: Trigramm-Index über Vor- und Nachnamen für die fehlertolerante Suche erstellen, per Trigger
+    synchron halten und mit den vorhandenen Personen befüllen."""
+    cursor = db.cursor()
+    # der trigram-Tokenizer indiziert jede Folge von drei Zeichen (ohne Beachtung der Groß-/Kleinschreibung)
+    cursor.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS person_name_trigram USING fts5 (
+        first_name, last_name,
+        tokenize = 'trigram'
+    );''')
+    # Dokumenthäufigkeit je Trigramm, um bei der Suche sehr häufige (wenig aussagekräftige) Trigramme auszulassen
+    cursor.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS person_name_trigram_vocab
+        USING fts5vocab (person_name_trigram, 'row');''')
+    cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS person_name_trigram_insert AFTER INSERT ON person BEGIN
+        {person_name_trigram_row_sql('NEW.person_id')}
+    END;''')
+    cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS person_name_trigram_update
+        AFTER UPDATE OF person_id, first_name, last_name ON person BEGIN
+        DELETE FROM person_name_trigram WHERE rowid = OLD.person_id;
+        {person_name_trigram_row_sql('NEW.person_id')}
+    END;''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS person_name_trigram_delete AFTER DELETE ON person BEGIN
+        DELETE FROM person_name_trigram WHERE rowid = OLD.person_id;
+    END;''')
+    # vorhandene Personen einmalig indizieren (die Bedingung person_id = person_id trifft auf alle Personen zu)
+    cursor.execute('''DELETE FROM person_name_trigram;''')
+    cursor.execute(person_name_trigram_row_sql('person_id'))
+
+
+# Spalten von cell_number_field, die beim Schreiben aus der Telefonnummer berechnet werden (Rückwärtssuche):
+# die normalisierte Nummer für exakte Treffer und dieselbe Nummer rückwärts für Treffer über die Endziffern
+CELL_NUMBER_DERIVED_COLUMNS = (
+    ('cell_number_normalized', lambda cell_number_field: normalize_phone_number(cell_number_field.cell_number) or None),
+    ('cell_number_reversed',
+     lambda cell_number_field: normalize_phone_number(cell_number_field.cell_number)[::-1] or None),
+)
+
+
+def add_cell_number_lookup_columns(db):
+    """Migration 5: normalisierte und rückwärts geschriebene Telefonnummern als indizierte Spalten hinzufügen und
+    für die vorhandenen Einträge berechnen."""
+    cursor = db.cursor()
+    cursor.execute('''ALTER TABLE cell_number_field ADD COLUMN cell_number_normalized TEXT;''')
+    cursor.execute('''ALTER TABLE cell_number_field ADD COLUMN cell_number_reversed TEXT;''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS cell_number_field_normalized_index
+        ON cell_number_field (cell_number_normalized);''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS cell_number_field_reversed_index
+        ON cell_number_field (cell_number_reversed);''')
+    # der Suchindex verwendet nur die Nummer selbst; das Befüllen der neuen Spalten soll ihn nicht neu aufbauen
+    cursor.execute('''DROP TRIGGER IF EXISTS person_search_cell_number_field_update;''')
+    cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS person_search_cell_number_field_update
+        AFTER UPDATE OF cell_number, person_id ON cell_number_field BEGIN
+        {person_search_row_sql('NEW.person_id')}
+    END;''')
+    fill_derived_columns(db, 'cell_number_field', 'cell_number_id', CELL_NUMBER_DERIVED_COLUMNS,
+                         only_missing=False)
+
+
+def fill_derived_columns(db, table: str, id_column: str, derived_columns: tuple, only_missing=True) -> int:
+    """Berechnete Spalten (derived_columns wie bei update_child_table) für vorhandene Einträge ausfüllen,
+    standardmäßig nur dort, wo die erste berechnete Spalte noch leer ist (z. B. von anderen Programmen geschrieben).
+    Bestätigt die Änderungen nicht selbst; gibt die Anzahl der berechneten Einträge zurück."""
+    cursor = db.cursor()
+    cursor.execute(f'''SELECT * FROM {table} {f"WHERE {derived_columns[0][0]} IS NULL" if only_missing else ""};''')
+    column_names = [description[0] for description in cursor.description]
+    rows = []
+    for row in cursor.fetchall():
+        entity = SimpleNamespace(**dict(zip(column_names, row)))  # die Funktionen lesen die Spalten als Attribute
+        rows.append(tuple(function(entity) for column, function in derived_columns) + (getattr(entity, id_column),))
+    cursor.executemany(f'''UPDATE {table} SET {", ".join(column + " = ?" for column, function in derived_columns)}
+    WHERE {id_column} = ?;''', rows)
+    return len(rows)
+
+
+def backfill_lookup_columns(db, only_missing=True) -> int:
+    """Normalisierte Telefonnummern, E-Mail-Adressen und Sortierschlüssel nachträglich berechnen (siehe
+    fill_derived_columns) und bestätigen. Gibt die Anzahl der berechneten Einträge zurück."""
+    begin_write_transaction(db)
+    try:
+        count = fill_derived_columns(db, 'cell_number_field', 'cell_number_id', CELL_NUMBER_DERIVED_COLUMNS,
+                                     only_missing)
+        if get_schema_version(db) >= 6:  # E-Mail-Spalten gibt es erst ab Migration 6
+            count += fill_derived_columns(db, 'custom_field', 'field_id', CUSTOM_FIELD_DERIVED_COLUMNS, only_missing)
+        if get_schema_version(db) >= 7:  # Sortierschlüssel gibt es erst ab Migration 7
+            count += fill_derived_columns(db, 'person', 'person_id', PERSON_DERIVED_COLUMNS, only_missing)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return count
+
+
+# Spalten von custom_field, die beim Schreiben für E-Mail-Felder (v_type 'eMail') berechnet werden: die
+# normalisierte Adresse und die rückwärts geschriebene Domain für die Suche nach allen Adressen einer Domain
+def custom_field_email(custom_field) -> str:
+    """Normalisierte E-Mail-Adresse eines benutzerdefinierten Feldes, '' wenn es kein E-Mail-Feld ist."""
+    return normalize_email(custom_field.field_value) if custom_field.v_type == 'eMail' else ''
+
+
+CUSTOM_FIELD_DERIVED_COLUMNS = (
+    ('email_normalized', lambda custom_field: custom_field_email(custom_field) or None),
+    ('email_domain_reversed', lambda custom_field: reversed_email_domain(custom_field_email(custom_field)) or None),
+)
+
+
+def add_email_lookup_columns(db):
+    """Migration 6: normalisierte E-Mail-Adressen und rückwärts geschriebene Domains der E-Mail-Felder als
+    indizierte Spalten hinzufügen und für die vorhandenen Einträge berechnen."""
+    cursor = db.cursor()
+    cursor.execute('''ALTER TABLE custom_field ADD COLUMN email_normalized TEXT;''')
+    cursor.execute('''ALTER TABLE custom_field ADD COLUMN email_domain_reversed TEXT;''')
+    # nur E-Mail-Felder haben Werte in diesen Spalten, die Indizes enthalten nur diese Einträge
+    cursor.execute('''CREATE INDEX IF NOT EXISTS custom_field_email_index
+        ON custom_field (email_normalized) WHERE email_normalized IS NOT NULL;''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS custom_field_email_domain_index
+        ON custom_field (email_domain_reversed) WHERE email_domain_reversed IS NOT NULL;''')
+    # der Suchindex verwendet nur den Wert selbst; das Befüllen der neuen Spalten soll ihn nicht neu aufbauen
+    cursor.execute('''DROP TRIGGER IF EXISTS person_search_custom_field_update;''')
+    cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS person_search_custom_field_update
+        AFTER UPDATE OF field_value, person_id ON custom_field BEGIN
+        {person_search_row_sql('NEW.person_id')}
+    END;''')
+    fill_derived_columns(db, 'custom_field', 'field_id', CUSTOM_FIELD_DERIVED_COLUMNS, only_missing=False)
+
+
+# Spalte von person, die beim Schreiben aus den Namen berechnet wird: Sortierschlüssel der Personenlisten
+PERSON_DERIVED_COLUMNS = (
+    ('sort_key', lambda person: person_sort_key(person.last_name, person.first_name)),
+)
+
+
+def add_person_sort_key_column(db):
+    """Migration 7: Sortierschlüssel (normalization.person_sort_key) als indizierte Spalte hinzufügen und für die
+    vorhandenen Personen berechnen."""
+    cursor = db.cursor()
+    cursor.execute('''ALTER TABLE person ADD COLUMN sort_key TEXT;''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS person_sort_key_index ON person (sort_key);''')
+    # die Listen werden nur noch nach sort_key sortiert, der alte Index auf den Namen wird nicht mehr gebraucht
+    cursor.execute('''DROP INDEX IF EXISTS person_name_index;''')
+    fill_derived_columns(db, 'person', 'person_id', PERSON_DERIVED_COLUMNS, only_missing=False)
+
+
+# Einfüge-Trigger der Suchindizes, die während insert_persons_bulk übersprungen werden (Name, Tabelle, Eintrag)
+SEARCH_INDEX_INSERT_TRIGGERS = (
+    ('person_search_person_insert', 'person', person_search_row_sql('NEW.person_id')),
+    ('person_search_address_insert', 'address', person_search_row_sql('NEW.person_id')),
+    ('person_search_cell_number_field_insert', 'cell_number_field', person_search_row_sql('NEW.person_id')),
+    ('person_search_custom_field_insert', 'custom_field', person_search_row_sql('NEW.person_id')),
+)
+
+
+def create_guarded_insert_triggers(db, triggers: tuple):
+    """Einfüge-Trigger (Name, Tabelle, Anweisungen) neu anlegen, sodass sie nur feuern, solange bulk_insert leer ist.
+    insert_persons_bulk trägt dort für die Dauer des Einfügens eine Zeile ein und füllt die Indizes danach
+    mengenbasiert."""
+    cursor = db.cursor()
+    for name, table, statements in triggers:
+        cursor.execute(f'''DROP TRIGGER IF EXISTS {name};''')
+        cursor.execute(f'''CREATE TRIGGER {name} AFTER INSERT ON {table}
+            WHEN NOT EXISTS (SELECT 1 FROM bulk_insert) BEGIN
+            {statements}
+        END;''')
+
+
+def add_bulk_insert_guard(db):
+    """Migration 8: Tabelle bulk_insert anlegen und die Einfüge-Trigger des Volltextindex nur noch außerhalb von
+    insert_persons_bulk feuern lassen. Pro Zeile bauten sie den Eintrag der Person neu auf, beim Masseneinfügen also
+    viermal pro Person."""
+    # bleibt außerhalb von insert_persons_bulk leer; die Zeile wird vor dem Commit wieder gelöscht, andere
+    # Verbindungen sehen sie also nie
+    db.execute('''CREATE TABLE IF NOT EXISTS bulk_insert (active INTEGER NOT NULL);''')
+    create_guarded_insert_triggers(db, SEARCH_INDEX_INSERT_TRIGGERS)
+
+
+def add_name_trigram_bulk_insert_guard(db):
+    """Migration 9: auch den Einfüge-Trigger des Trigramm-Index während insert_persons_bulk überspringen (siehe
+    add_bulk_insert_guard)."""
+    create_guarded_insert_triggers(db, (
+        ('person_name_trigram_insert', 'person', person_name_trigram_row_sql('NEW.person_id')),
+    ))
+
+
+def index_null_safe_sort_key(db):
+    """Migration 10: person_sort_key_index über ifnull(sort_key, '') neu anlegen. Die Personenlisten sortieren nach
+    diesem Ausdruck (siehe PERSON_SORT_KEY), damit von anderen Programmen ohne sort_key eingetragene Personen nicht aus
+    der Keyset-Paginierung fallen."""
+    db.execute('''DROP INDEX IF EXISTS person_sort_key_index;''')
+    db.execute('''CREATE INDEX person_sort_key_index ON person (ifnull(sort_key, ''));''')
+
+
+# Geordnete Liste der Schema-Migrationen. Migration i (ab 1 gezählt) hebt die Datenbank von Version i - 1 auf i.
+# Bestehende Einträge dürfen nicht mehr verändert werden, Schemaänderungen werden als neue Migration angehängt.
+MIGRATIONS = [
+    create_schema,
+    create_indexes,
+    create_search_index,
+    create_name_trigram_index,
+    add_cell_number_lookup_columns,
+    add_email_lookup_columns,
+    add_person_sort_key_column,
+    add_bulk_insert_guard,
+    add_name_trigram_bulk_insert_guard,
+    index_null_safe_sort_key,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(db) -> int:
+    """Schema-Version der Datenbankdatei auslesen (PRAGMA user_version)."""
+    return db.execute('PRAGMA user_version;').fetchone()[0]
+
+
+def migrate(db):
+    """Ausstehende Migrationen in einer Transaktion ausführen und die Schema-Version fortschreiben."""
+    if get_schema_version(db) >= SCHEMA_VERSION:
+        return  # Normalfall: nur ein einziges, günstiges PRAGMA
+    # Schreibsperre holen, damit nicht zwei Verbindungen gleichzeitig migrieren
+    retry_on_busy(lambda: db.execute('BEGIN IMMEDIATE;'))
+    try:
+        version = get_schema_version(db)  # erneut lesen, eine andere Verbindung könnte bereits migriert haben
+        for next_version in range(version + 1, SCHEMA_VERSION + 1):
+            MIGRATIONS[next_version - 1](db)
+            db.execute(f'PRAGMA user_version = {next_version};')
+        db.commit()
+    except BaseException:
+        db.rollback()  # bei Fehlern bleibt die Datenbank auf der alten Version
+        raise
 
 
 def insert_person(db,
@@ -129,8 +580,9 @@ def insert_person(db,
     modification_date = int(time.time())  # Änderung dann dokumentieren, wenn Daten gesetzt werden
     cursor = db.cursor()
     # INSERT durchführen
-    cursor.execute('''INSERT INTO person (modification_date, last_name, first_name, birthdate) VALUES (?, ?, ?, ?);''',
-                   (modification_date, person.last_name, person.first_name, person.birthdate))
+    cursor.execute('''INSERT INTO person (modification_date, last_name, first_name, birthdate, sort_key)
+    VALUES (?, ?, ?, ?, ?);''', (modification_date, person.last_name, person.first_name, person.birthdate) +
+                   tuple(function(person) for column, function in PERSON_DERIVED_COLUMNS))
     person_id = cursor.lastrowid
     person.person_id = person_id  # ID auch in das PersonVO-Objekt eintragen
     if person.groups:
@@ -205,8 +657,10 @@ def insert_custom_field(db,
         raise EntityAlreadyExistsException('The specified entity already exists in the database')
     cursor = db.cursor()
     # INSERT durchführen
-    cursor.execute('''INSERT INTO custom_field (label, field_value, v_type, person_id) VALUES (?, ?, ?, ?);''',
-                   (custom_field.label, custom_field.field_value, custom_field.v_type, custom_field.person.person_id))
+    cursor.execute('''INSERT INTO custom_field (label, field_value, v_type, person_id, email_normalized,
+    email_domain_reversed) VALUES (?, ?, ?, ?, ?, ?);''',
+                   (custom_field.label, custom_field.field_value, custom_field.v_type, custom_field.person.person_id) +
+                   tuple(function(custom_field) for column, function in CUSTOM_FIELD_DERIVED_COLUMNS))
     db.commit()
     field_id = cursor.lastrowid
     custom_field.field_id = field_id  # ID auch in das CustomFieldVO-Objekt eintragen
@@ -221,29 +675,395 @@ def insert_cell_number_field(db,
         raise EntityAlreadyExistsException('The specified entity already exists in the database')
     cursor = db.cursor()
     # INSERT durchführen
-    cursor.execute('''INSERT INTO cell_number_field (label, cell_number, person_id) VALUES (?, ?, ?)''',
-                   (cell_number_field.label, cell_number_field.cell_number, cell_number_field.person.person_id))
+    cursor.execute('''INSERT INTO cell_number_field (label, cell_number, person_id, cell_number_normalized,
+    cell_number_reversed) VALUES (?, ?, ?, ?, ?)''',
+                   (cell_number_field.label, cell_number_field.cell_number, cell_number_field.person.person_id) +
+                   tuple(function(cell_number_field) for column, function in CELL_NUMBER_DERIVED_COLUMNS))
     db.commit()
     cell_number_id = cursor.lastrowid
     cell_number_field.cell_number_id = cell_number_id  # ID auch in das CellNumberFieldVO-Objekt eintragen
     return cell_number_id
 
 
+def begin_write_transaction(db):
+    """Schreibtransaktion beginnen, sofern die Verbindung nicht bereits in einer Transaktion ist."""
+    if not db.in_transaction:
+        # Schreibsperre sofort holen, nicht erst beim ersten INSERT
+        retry_on_busy(lambda: db.execute('BEGIN IMMEDIATE;'))
+
+
+def get_existing_ids(db, table: str, id_column: str, ids) -> set:
+    """Menge der angegebenen IDs zurückgeben, die in der Tabelle bereits existieren (eine Abfrage je 500 IDs)."""
+    ids = list(ids)
+    existing_ids = set()
+    for start in range(0, len(ids), 500):  # Anzahl der SQL-Parameter pro Abfrage begrenzen
+        chunk = ids[start:start + 500]
+        cursor = db.execute(f'SELECT {id_column} FROM {table} WHERE {id_column} IN ({", ".join("?" * len(chunk))});',
+                            chunk)
+        existing_ids.update(row[0] for row in cursor.fetchall())
+    return existing_ids
+
+
+def get_next_id(db, table: str, id_column: str) -> int:
+    """Nächste freie ID einer Tabelle ermitteln (nur innerhalb einer Schreibtransaktion verlässlich)."""
+    return db.execute(f'SELECT ifnull(max({id_column}), 0) + 1 FROM {table};').fetchone()[0]
+
+
+def get_assigned_ids(persons: [PersonVO]) -> [tuple]:
+    """(Objekt, ID-Attribut, ID) der Personen und der Einträge ihrer geladenen Kind-Sammlungen, um die beim Speichern
+    vergebenen IDs nach einem Rollback mit restore_ids zurücksetzen zu können. Gruppen werden nicht erfasst, ihre IDs
+    vergibt nur upsert_contact_group."""
+    assigned_ids = []
+    for person in persons:
+        assigned_ids.append((person, 'person_id', person.person_id))
+        if person.is_loaded('addresses'):
+            assigned_ids += [(address, 'address_id', address.address_id) for address in person.addresses]
+        if person.is_loaded('cell_number_fields'):
+            assigned_ids += [(cell_number_field, 'cell_number_id', cell_number_field.cell_number_id)
+                             for cell_number_field in person.cell_number_fields]
+        if person.is_loaded('custom_fields'):
+            assigned_ids += [(custom_field, 'field_id', custom_field.field_id) for custom_field in person.custom_fields]
+    return assigned_ids
+
+
+def restore_ids(assigned_ids: [tuple]):
+    """Mit get_assigned_ids gemerkte IDs wieder in die Objekte eintragen, damit sie nach einem Rollback nicht auf
+    verworfene Zeilen verweisen (SQLite vergibt dieselben IDs sonst erneut an andere Einträge)."""
+    for entity, attribute, entity_id in reversed(assigned_ids):
+        setattr(entity, attribute, entity_id)
+        if type(entity) in (PersonVO, ContactGroupVO):
+            entity.invalidate_id_indexes()
+
+
+def insert_persons_bulk(db, persons: [PersonVO]) -> [int]:
+    """Viele PersonVO-Objekte samt Adressen, Telefonnummern, benutzerdefinierten Feldern und Gruppenzugehörigkeiten
+    in einer einzigen Transaktion einpflegen (ein executemany pro Tabelle) und die vergebenen IDs eintragen."""
+    for person in persons:
+        if type(person) != PersonVO:
+            # Exception werfen, wenn ein Objekt keine Person ist
+            raise NoSuchEntityTypeException(f'There is no such entity type {type(person)} to be inserted as person.')
+    original_ids = get_assigned_ids(persons)  # alte IDs merken, um sie bei einem Fehler wiederherstellen zu können
+
+    begin_write_transaction(db)
+    try:
+        # Existenzprüfungen gebündelt statt einzeln pro Entität
+        for table, id_column in (('person', 'person_id'), ('address', 'address_id'),
+                                 ('cell_number_field', 'cell_number_id'), ('custom_field', 'field_id')):
+            ids = [entity_id for entity, attribute, entity_id in original_ids
+                   if attribute == id_column and entity_id is not None]
+            if ids and get_existing_ids(db, table, id_column, ids):
+                # Exception werfen, wenn eine der Entitäten bereits exisitiert
+                raise EntityAlreadyExistsException('The specified entity already exists in the database')
+        # Gruppenzugehörigkeiten werden nur für bereits gespeicherte ContactGroups eingetragen
+        existing_group_ids = get_existing_ids(db, 'contact_group', 'group_id',
+                                              {group.group_id for person in persons for group in person.groups
+                                               if group.group_id})
+
+        # IDs selbst vergeben, damit sie auch ohne lastrowid pro Zeile bekannt sind
+        person_id = get_next_id(db, 'person', 'person_id')
+        address_id = get_next_id(db, 'address', 'address_id')
+        cell_number_id = get_next_id(db, 'cell_number_field', 'cell_number_id')
+        field_id = get_next_id(db, 'custom_field', 'field_id')
+        modification_date = int(time.time())  # Änderung dann dokumentieren, wenn Daten gesetzt werden
+        person_rows, belongs_to_rows, address_rows, cell_number_field_rows, custom_field_rows = [], [], [], [], []
+        for person in persons:
+            person.person_id = person_id
+            person.modification_date = modification_date
+            person_id += 1
+            person_rows.append((person.person_id, modification_date, person.last_name, person.first_name,
+                                person.birthdate) + tuple(function(person) for column, function in PERSON_DERIVED_COLUMNS))
+            for group_id in {group.group_id for group in person.groups if group.group_id in existing_group_ids}:
+                belongs_to_rows.append((group_id, person.person_id))
+            for address in person.addresses:
+                address.address_id = address_id
+                address_id += 1
+                address_rows.append((address.address_id, address.label, address.street, address.house_number,
+                                     address.zip_code, address.town, person.person_id))
+            for cell_number_field in person.cell_number_fields:
+                cell_number_field.cell_number_id = cell_number_id
+                cell_number_id += 1
+                cell_number_field_rows.append((cell_number_field.cell_number_id, cell_number_field.label,
+                                               cell_number_field.cell_number, person.person_id) +
+                                              tuple(function(cell_number_field)
+                                                    for column, function in CELL_NUMBER_DERIVED_COLUMNS))
+            for custom_field in person.custom_fields:
+                custom_field.field_id = field_id
+                field_id += 1
+                custom_field_rows.append((custom_field.field_id, custom_field.label, custom_field.field_value,
+                                          custom_field.v_type, person.person_id) +
+                                         tuple(function(custom_field)
+                                               for column, function in CUSTOM_FIELD_DERIVED_COLUMNS))
+
+        cursor = db.cursor()
+        # die Einfüge-Trigger der Suchindizes überspringen (siehe add_bulk_insert_guard und
+        # add_name_trigram_bulk_insert_guard) ...
+        cursor.execute('''INSERT INTO bulk_insert (active) VALUES (1);''')
+        cursor.executemany('''INSERT INTO person (person_id, modification_date, last_name, first_name, birthdate,
+        sort_key) VALUES (?, ?, ?, ?, ?, ?);''', person_rows)
+        cursor.executemany('''INSERT INTO address (address_id, label, street, house_number, zip_code, town, person_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?);''', address_rows)
+        cursor.executemany('''INSERT INTO cell_number_field (cell_number_id, label, cell_number, person_id,
+        cell_number_normalized, cell_number_reversed) VALUES (?, ?, ?, ?, ?, ?);''', cell_number_field_rows)
+        cursor.executemany('''INSERT INTO custom_field (field_id, label, field_value, v_type, person_id,
+        email_normalized, email_domain_reversed) VALUES (?, ?, ?, ?, ?, ?, ?);''', custom_field_rows)
+        cursor.executemany('''INSERT INTO belongs_to (group_id, person_id) VALUES (?, ?);''', belongs_to_rows)
+        cursor.execute('''DELETE FROM bulk_insert;''')
+        if persons:
+            # ... und die Einträge der neuen Personen (fortlaufende IDs) stattdessen mengenbasiert einfügen
+            new_person_ids = {'first_id': persons[0].person_id, 'last_id': persons[-1].person_id}
+            cursor.execute(person_search_rows_sql('BETWEEN :first_id AND :last_id'), new_person_ids)
+            cursor.execute(person_name_trigram_rows_sql('BETWEEN :first_id AND :last_id'), new_person_ids)
+        db.commit()  # eine einzige Bestätigung für alle Personen
+    except BaseException:
+        db.rollback()
+        restore_ids(original_ids)  # VOs wieder in den Zustand vor dem Einfügen versetzen
+        raise
+    return [person.person_id for person in persons]
+
+
 def get_all_persons(db) -> [PersonVO]:
     """Holen aller in der Datenbank abgespeicherten PersonVO-Objekten."""
-    cursor = db.cursor()
-    persons = []
-    # alle IDs aus der Datenbank holen
-    cursor.execute('''SELECT person_id FROM person;''')
-    person_data_sets = cursor.fetchall()
-    for person_data in person_data_sets:
-        # Für jede ID ein PersonVO-Objekt erzeugen und an Liste aller Personen anhängen
-        persons.append(get_person_by_id(db, person_data[0]))
-    return persons
+    return load_persons(db)
 
 
-def get_all_contact_groups(db) -> [ContactGroupVO]:
-    """Holen aller in der Datenbank abgespeicherten ContactGroupVO-Objekten."""
+def load_persons(db, person_ids_query: str = None, parameters=(), with_groups=True, lazy_loader=None) -> [PersonVO]:
+    """PersonVO-Objekte samt Gruppen, Adressen, Telefonnummern und benutzerdefinierten Feldern mit einer festen
+    Anzahl von Abfragen laden (eine pro Tabelle), unabhängig von der Anzahl der Personen.
+
+    person_ids_query ist eine optionale Unterabfrage, die die zu ladenden person_ids liefert
+    (z. B. 'SELECT person_id FROM belongs_to WHERE group_id = ?'); ohne sie werden alle Personen geladen.
+    Mit lazy_loader werden nur die Personen selbst geladen und ihre Kind-Sammlungen erst beim ersten Zugriff
+    (siehe PersonVO.defer_collections)."""
+    cursor = db.cursor()
+    person_filter = f' WHERE person_id IN ({person_ids_query})' if person_ids_query else ''
+    cursor.execute('''SELECT person_id, last_name, first_name, birthdate, modification_date FROM person'''
+                   + person_filter + f' ORDER BY {PERSON_SORT_KEY};', parameters)
+    persons = {}
+    for person_data in cursor.fetchall():
+        persons[person_data[0]] = PersonVO.from_row(*person_data)
+
+    if lazy_loader is not None:
+        for person in persons.values():
+            person.defer_collections(lazy_loader)
+    else:
+        collections = PersonVO.COLLECTIONS if with_groups else PersonVO.COLLECTIONS[1:]
+        # ohne Unterabfrage sind es alle Personen, die Kind-Tabellen werden dann ohne Einschränkung gelesen
+        load_person_collections(db, persons, collections, person_ids_query, parameters,
+                                all_persons=not person_ids_query)
+    return list(persons.values())
+
+
+def load_person_collections(db, persons: dict, collections=PersonVO.COLLECTIONS, person_ids_query: str = None,
+                            parameters=(), all_persons=False):
+    """Kind-Sammlungen (Namen aus PersonVO.COLLECTIONS) der Personen in persons (person_id -> PersonVO) mit einer
+    Abfrage je Sammlung laden; bereits vorhandene Einträge der Sammlungen werden ersetzt.
+
+    person_ids_query ist wie bei load_persons eine Unterabfrage für die person_ids; ohne sie werden die IDs aus
+    persons als Parameter übergeben (eine Abfrage je 500 Personen). Mit all_persons=True enthält persons alle
+    Personen, die Tabellen werden dann ohne Einschränkung gelesen (eine Abfrage je Sammlung)."""
+    if person_ids_query is None and not all_persons:
+        person_ids = list(persons)
+        for start in range(0, len(person_ids), 500):  # Anzahl der SQL-Parameter pro Abfrage begrenzen
+            chunk = person_ids[start:start + 500]
+            # eine Liste von Parametern ist in "IN (...)" ebenso gültig wie eine Unterabfrage
+            load_person_collections(db, {person_id: persons[person_id] for person_id in chunk}, collections,
+                                    ', '.join('?' * len(chunk)), chunk)
+        return
+    cursor = db.cursor()
+
+    def person_filter(column='person_id'):
+        # dieselbe Einschränkung wird auf jede Tabelle angewendet, damit alle Abfragen nur die benötigten Zeilen liefern
+        return '' if all_persons else f' WHERE {column} IN ({person_ids_query})'
+
+    for person in persons.values():
+        for collection in collections:
+            setattr(person, collection, [])  # leere Liste zuerst setzen, damit der Zugriff unten nichts nachlädt
+
+    # Bezeichnungen, Typen und Orte wiederholen sich in fast jeder Zeile, sqlite3 liefert aber für jede Zeile eine
+    # eigene Zeichenkette; gleiche Werte werden deshalb nur einmal im Speicher gehalten
+    shared_values = {}
+    share = shared_values.setdefault
+
+    if 'groups' in collections:
+        # ContactGroups werden einmal pro ID erzeugt und von allen ihren Mitgliedern geteilt
+        cursor.execute('''SELECT belongs_to.person_id, contact_group.group_id, contact_group.title
+        FROM belongs_to JOIN contact_group ON contact_group.group_id = belongs_to.group_id'''
+                       + person_filter('belongs_to.person_id') + ';', parameters)
+        contact_groups = {}
+        for person_id, group_id, title in cursor.fetchall():
+            person = persons.get(person_id)
+            if person is None:
+                continue  # Person wurde zwischen den Abfragen eingefügt
+            contact_group = contact_groups.get(group_id)
+            if contact_group is None:
+                contact_group = contact_groups[group_id] = ContactGroupVO.from_row(group_id, title)
+            # Beziehung in beide Richtungen setzen, ohne die linearen Prüfungen der Konstruktoren
+            person.groups.append(contact_group)
+            contact_group.persons.append(person)
+
+    if 'addresses' in collections:
+        cursor.execute('''SELECT address_id, label, street, house_number, zip_code, town, person_id FROM address'''
+                       + person_filter() + ';', parameters)
+        for address_id, label, street, house_number, zip_code, town, person_id in cursor.fetchall():
+            person = persons.get(person_id)
+            if person is not None:
+                person.addresses.append(
+                    AddressVO.from_row(person, address_id, share(label, label), share(street, street), house_number,
+                                       share(zip_code, zip_code), share(town, town)))
+
+    if 'cell_number_fields' in collections:
+        cursor.execute('''SELECT cell_number_id, label, cell_number, person_id FROM cell_number_field'''
+                       + person_filter() + ';', parameters)
+        for cell_number_id, label, cell_number, person_id in cursor.fetchall():
+            person = persons.get(person_id)
+            if person is not None:
+                person.cell_number_fields.append(
+                    CellNumberFieldVO.from_row(person, cell_number_id, share(label, label), cell_number))
+
+    if 'custom_fields' in collections:
+        cursor.execute('''SELECT field_id, label, field_value, v_type, person_id FROM custom_field'''
+                       + person_filter() + ';', parameters)
+        for field_id, label, field_value, v_type, person_id in cursor.fetchall():
+            person = persons.get(person_id)
+            if person is not None:
+                person.custom_fields.append(
+                    CustomFieldVO.from_row(person, field_id, share(label, label), field_value, share(v_type, v_type)))
+
+
+def get_member_ids(db, group_id) -> set:
+    """IDs der Mitglieder einer ContactGroup; liest nur den Primärschlüssel von belongs_to."""
+    return {row[0] for row in db.execute('''SELECT person_id FROM belongs_to WHERE group_id = ?;''', (group_id,))}
+
+
+# Reihenfolge der Personenlisten; person_sort_key_index enthält beide Spalten (die rowid steht in jedem Index).
+# Personen, die andere Programme ohne sort_key eingetragen haben, stehen mit '' am Anfang, statt mit NULL aus dem
+# Vergleich der Keyset-Paginierung herauszufallen
+SORT_KEY_EXPRESSION = "ifnull(sort_key, '')"
+PERSON_SORT_KEY = f'{SORT_KEY_EXPRESSION}, person_id'
+PERSON_SUMMARY_COLUMNS = f'person_id, last_name, first_name, modification_date, {SORT_KEY_EXPRESSION}'
+
+
+def person_summary(person_data: tuple) -> PersonSummaryVO:
+    """PersonSummaryVO aus einer Zeile mit den Spalten PERSON_SUMMARY_COLUMNS erzeugen."""
+    person_id, last_name, first_name, modification_date, sort_key = person_data
+    return PersonSummaryVO(person_id, last_name, first_name, modification_date, (sort_key, person_id))
+
+
+def get_person_summaries(db) -> [PersonSummaryVO]:
+    """Kurzfassungen aller Personen sortiert nach Nachname und Vorname, mit einer einzigen Abfrage."""
+    cursor = db.execute(f'''SELECT {PERSON_SUMMARY_COLUMNS} FROM person ORDER BY {PERSON_SORT_KEY};''')
+    return [person_summary(person_data) for person_data in cursor.fetchall()]
+
+
+def get_person_page(db, group_id=None, after_key: tuple = None, limit: int = 100) -> ([PersonSummaryVO], tuple):
+    """Eine Seite von Kurzfassungen der Personen sortiert nach Nachname, Vorname und ID, optional nur die
+    Mitglieder einer ContactGroup.
+
+    after_key ist der Schlüssel (sort_key, person_id), den der vorherige Aufruf zurückgegeben hat (None für die erste
+    Seite); die Abfrage springt über person_sort_key_index direkt an diese Stelle, statt wie mit OFFSET alle
+    vorherigen Zeilen zu überlesen.
+    Gibt die Personen und den Schlüssel für die nächste Seite zurück (None, wenn es keine weitere gibt)."""
+    source = 'person'
+    conditions = []
+    parameters = []
+    if group_id is not None and is_small_contact_group(db, group_id):
+        # wenige Mitglieder: diese über den Primärschlüssel von belongs_to holen und sortieren (CROSS JOIN legt die
+        # Reihenfolge fest); in Sortierreihenfolge über alle Personen zu laufen, würde fast nur Nicht-Mitglieder prüfen
+        source = '''(SELECT person_id AS member_id FROM belongs_to WHERE group_id = ?) AS member
+        CROSS JOIN person ON person.person_id = member.member_id'''
+        parameters.append(group_id)
+    elif group_id is not None:
+        # viele Mitglieder: als EXISTS je Person statt IN (...), so läuft die Abfrage in Sortierreihenfolge über
+        # person_sort_key_index und prüft die Mitgliedschaft per Primärschlüssel von belongs_to, statt zuerst alle
+        # Mitglieder der Gruppe zu lesen und zu sortieren
+        conditions.append('EXISTS (SELECT 1 FROM belongs_to WHERE group_id = ? AND person_id = person.person_id)')
+        parameters.append(group_id)
+    if after_key is not None:
+        # wie bei get_recently_modified beginnt die Suche im Index erst mit der zusätzlichen Bedingung auf den
+        # Sortierschlüssel an der richtigen Stelle; ein Schlüssel None (aus einer älteren Seite) entspricht ''
+        sort_key, person_id = after_key[0] or '', after_key[1]
+        conditions.append(f'{SORT_KEY_EXPRESSION} >= ? AND ({PERSON_SORT_KEY}) > (?, ?)')
+        parameters.extend((sort_key, sort_key, person_id))
+    where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+    # eine Zeile mehr holen, um ohne weitere Abfrage zu erkennen, ob noch eine Seite folgt
+    cursor = db.execute(f'''SELECT {PERSON_SUMMARY_COLUMNS} FROM {source}{where}
+        ORDER BY {PERSON_SORT_KEY} LIMIT ?;''', parameters + [limit + 1])
+    persons = [person_summary(person_data) for person_data in cursor.fetchall()]
+    if len(persons) <= limit:
+        return persons, None
+    return persons[:limit], persons[limit - 1].sort_key
+
+
+# Gruppen bis zu dieser Größe liest get_person_page über ihre Mitglieder statt in Sortierreihenfolge über alle Personen
+SMALL_CONTACT_GROUP_SIZE = 1000
+
+
+def is_small_contact_group(db, group_id) -> bool:
+    """Ob die ContactGroup höchstens SMALL_CONTACT_GROUP_SIZE Mitglieder hat; überspringt dazu höchstens so viele
+    Einträge im Primärschlüssel von belongs_to, unabhängig von der Größe der Gruppe."""
+    return not db.execute('''SELECT EXISTS (SELECT 1 FROM belongs_to WHERE group_id = ? LIMIT 1 OFFSET ?);''',
+                          (group_id, SMALL_CONTACT_GROUP_SIZE)).fetchone()[0]
+
+
+def get_recently_modified(db, since: int, after_key: tuple = None, limit: int = 100) -> ([PersonSummaryVO], tuple):
+    """Kurzfassungen der seit since (Unix-Zeit) geänderten Personen, die zuletzt geänderten zuerst. Die Abfrage liest
+    über person_modification_date_index nur den Bereich ab since, unabhängig von der Gesamtzahl der Personen.
+
+    Keyset-Paginierung wie bei get_person_page: after_key ist der zurückgegebene Schlüssel (modification_date,
+    person_id) der vorherigen Seite; limit=None liefert alle Treffer auf einmal."""
+    conditions = ['modification_date >= ?']
+    parameters = [since]
+    if after_key is not None:
+        # Zeilenwert-Vergleiche allein nutzt SQLite hier nicht für die Indexsuche, erst die zusätzliche Bedingung
+        # auf modification_date lässt die Abfrage im Index an der richtigen Stelle beginnen
+        conditions.append('modification_date <= ? AND (modification_date, person_id) < (?, ?)')
+        parameters.extend((after_key[0],) + tuple(after_key))
+    cursor = db.execute(f'''SELECT {PERSON_SUMMARY_COLUMNS} FROM person WHERE {' AND '.join(conditions)}
+        ORDER BY modification_date DESC, person_id DESC LIMIT ?;''', parameters + [-1 if limit is None else limit + 1])
+    persons = [person_summary(person_data) for person_data in cursor.fetchall()]
+    if limit is None or len(persons) <= limit:
+        return persons, None
+    return persons[:limit], (persons[limit - 1].modification_date, persons[limit - 1].person_id)
+
+
+def get_person_summaries_by_ids(db, person_ids, group_id=None) -> [PersonSummaryVO]:
+    """Kurzfassungen der Personen mit den angegebenen IDs in deren Reihenfolge, optional nur der Mitglieder einer
+    ContactGroup; nicht existierende IDs werden übergangen (eine Abfrage je 500 IDs)."""
+    person_ids = list(person_ids)
+    group_filter = ' AND person_id IN (SELECT person_id FROM belongs_to WHERE group_id = ?)' if group_id else ''
+    persons = {}
+    for start in range(0, len(person_ids), 500):  # Anzahl der SQL-Parameter pro Abfrage begrenzen
+        chunk = person_ids[start:start + 500]
+        cursor = db.execute(f'''SELECT {PERSON_SUMMARY_COLUMNS} FROM person
+            WHERE person_id IN ({", ".join("?" * len(chunk))}){group_filter};''',
+                            chunk + ([group_id] if group_id else []))
+        for person_data in cursor.fetchall():
+            persons[person_data[0]] = person_summary(person_data)
+    return [persons[person_id] for person_id in person_ids if person_id in persons]
+
+
+def get_all_contact_groups(db, summary_only=False, lazy_loader=None) -> [ContactGroupVO]:
+    """Holen aller in der Datenbank abgespeicherten ContactGroupVO-Objekten; summary_only wie bei
+    get_contact_group_by_group_id.
+
+    Mit lazy_loader werden die Mitglieder aller Gruppen mit einer einzigen Abfrage und wie bei load_persons ohne ihre
+    Kind-Sammlungen geladen; eine Person ist dann in allen ihren Gruppen dasselbe Objekt."""
+    if lazy_loader is not None:
+        contact_groups = {contact_group.group_id: contact_group
+                          for contact_group in get_contact_groups_without_members(db)}
+        persons = {}
+        cursor = db.execute('''SELECT belongs_to.group_id, person.person_id, last_name, first_name, birthdate,
+        modification_date FROM belongs_to JOIN person ON person.person_id = belongs_to.person_id
+        ORDER BY ifnull(person.sort_key, ''), person.person_id;''')
+        for group_id, *person_data in cursor.fetchall():
+            person = persons.get(person_data[0])
+            if person is None:
+                person = persons[person_data[0]] = PersonVO.from_row(*person_data)
+                person.defer_collections(lazy_loader)
+            contact_group = contact_groups.get(group_id)
+            if contact_group is not None:  # Gruppe wurde zwischen den Abfragen eingefügt
+                contact_group.persons.append(person)  # groups der Person wird erst beim ersten Zugriff geladen
+        return list(contact_groups.values())
     cursor = db.cursor()
     contact_groups = []
     # alle IDs aus der Datenbank holen
@@ -251,57 +1071,118 @@ def get_all_contact_groups(db) -> [ContactGroupVO]:
     contact_group_data_sets = cursor.fetchall()
     for contact_group_data in contact_group_data_sets:
         # Für jede ID ein ContactGroupVO-Objekt erzeugen und an Liste aller ContactGroups anhängen
-        contact_groups.append(get_contact_group_by_group_id(db, contact_group_data[0]))
+        contact_groups.append(get_contact_group_by_group_id(db, contact_group_data[0], summary_only))
     return contact_groups
 
 
-def get_person_by_id(db, person_id):
-    """Erzeugen eines PersonVO-Objektes aus den Daten in der Datenbank."""
-    cursor = db.cursor()
-    # Alle Attribute für zugehörige Person aus der Datenbank holen
-    cursor.execute(
-        '''SELECT person_id, last_name, first_name, birthdate, modification_date FROM person WHERE person_id = ?;''',
-        (person_id,))
-    person_data_set = cursor.fetchall()
-    if person_data_set:
-        person_data_set = person_data_set[0]  # Personen-Daten-Tupel aus der einelementigen Liste extrahieren
-        # Holen aller IDs der Person zugehörigen ContactGroupVOs
-        cursor.execute('''SELECT group_id FROM belongs_to WHERE person_id = ?;''', (person_id,))
-        group_ids = cursor.fetchall()
-        contact_groups = []
-        for group_id in group_ids:
-            group_id = group_id[0]  # ID aus der einelementigen Liste extrahieren
-            cursor.execute('''SELECT group_id, title FROM contact_group WHERE group_id = ?;''', (group_id,))
-            contact_group_data = cursor.fetchall()[
-                0]  # ContactGroup-Daten-Tupel aus der einelementigen Liste extrahieren
-            # ContactGroupVO-Objekt aus Daten zusammenstellen
-            contact_group = ContactGroupVO(group_id=contact_group_data[0], title=contact_group_data[1])
-            contact_groups.append(contact_group)  # ContactGroup zur Liste der ContactGroups der Person hinzufügen
-
-        # PersonVO-Objekt aus gewonnenen Daten erzeugen
-        # Adress-, Telefonnummer-, und benutzerdefinierte Felder werden erst später hinzugefügt,
-        # da für deren Erzeugen ein existierendes PersonVO-Objekt bestehen muss
-        person = PersonVO(person_id=person_data_set[0], last_name=person_data_set[1],
-                          first_name=person_data_set[2],
-                          birthdate=person_data_set[3], modification_date=person_data_set[4],
-                          groups=contact_groups,
-                          addresses=[], cell_number_fields=[],
-                          custom_fields=[])
-        addresses = get_addresses_by_person(db, person)
-        cell_number_fields = get_cell_number_fields_by_person(db, person)
-        custom_fields = get_custom_fields_by_person(db, person)
-        # Hinzufügen der gerade erzeugten Listen aus Adressen, Telefonnummern und benutzerdefinierten Feldern
-        person.addresses = addresses
-        person.cell_number_fields = cell_number_fields
-        person.custom_fields = custom_fields
-        return person
+def get_contact_groups_without_members(db) -> [ContactGroupVO]:
+    """Alle ContactGroups nur mit ID und Titel (persons bleibt leer), mit einer einzigen Abfrage; z. B. um Gruppen
+    anhand ihres Titels zuzuordnen, ohne ihre Mitglieder zu laden."""
+    cursor = db.execute('''SELECT group_id, title FROM contact_group;''')
+    return [ContactGroupVO.from_row(group_id, title) for group_id, title in cursor.fetchall()]
+
+
+def get_person_by_id(db, person_id, lazy_loader=None):
+    """Erzeugen eines PersonVO-Objektes aus den Daten in der Datenbank; mit lazy_loader wie bei load_persons ohne
+    die Kind-Sammlungen, die erst beim ersten Zugriff geladen werden."""
+    persons = load_persons(db, '?', (person_id,), lazy_loader=lazy_loader)
+    if persons:
+        return persons[0]
     else:
         # Exception werfen, wenn Eintrag mit gegebener ID nicht existiert
         raise NoSuchEntityException('There is no person entity with the specified person_id')
 
 
-def get_contact_group_by_group_id(db, group_id):
-    """Erzeugen eines ContactGroupVO-Objektes aus den Daten in der Datenbank."""
+def search_persons(db, query: str, limit: int = 50) -> [int]:
+    """IDs der Personen zurückgeben, die alle Wörter der Suchanfrage (auch als Wortanfang) enthalten, sortiert nach
+    Relevanz (FTS5-Rang). limit=None liefert alle Treffer."""
+    # jedes Wort als Zeichenkette quoten, damit Sonderzeichen der FTS5-Syntax (", *, -, :, ...) nicht ausgewertet
+    # werden, und als Präfix suchen
+    terms = ['"' + term.replace('"', '""') + '"*' for term in query.split()]
+    if not terms:
+        return []
+    cursor = db.execute('''SELECT rowid FROM person_search WHERE person_search MATCH ? ORDER BY rank LIMIT ?;''',
+                        (' '.join(terms), -1 if limit is None else limit))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_name_trigram_candidates(db, query_trigrams: set, limit: int = 200, max_documents: int = 5000) -> [tuple]:
+    """Vorauswahl für die fehlertolerante Suche: (person_id, first_name, last_name) der Personen, deren Namen die
+    meisten der seltensten angegebenen Trigramme enthalten."""
+    if not query_trigrams:
+        return []
+    query_trigrams = list(query_trigrams)
+    cursor = db.execute(f'''SELECT term, doc FROM person_name_trigram_vocab
+    WHERE term IN ({", ".join("?" * len(query_trigrams))});''', query_trigrams)
+    # seltene Trigramme zuerst; sehr häufige ("er ", "  m", ...) nur, solange die Kandidatenmenge klein bleibt,
+    # denn die Bewertung (rank) kostet Zeit für jeden Treffer
+    selected_trigrams, documents = [], 0
+    for trigram, document_count in sorted(cursor.fetchall(), key=lambda row: row[1]):
+        if len(selected_trigrams) >= 2 and documents + document_count > max_documents:
+            break
+        selected_trigrams.append(trigram)
+        documents += document_count
+    if not selected_trigrams:
+        return []
+    cursor = db.execute('''SELECT rowid, first_name, last_name FROM person_name_trigram
+    WHERE person_name_trigram MATCH ? ORDER BY rank LIMIT ?;''',
+                        (' OR '.join('"' + trigram.replace('"', '""') + '"' for trigram in selected_trigrams), limit))
+    return cursor.fetchall()
+
+
+def find_person_ids_by_phone(db, number: str) -> [int]:
+    """IDs der Personen mit der angegebenen Telefonnummer. Zuerst exakte Treffer der normalisierten Nummer, danach
+    Nummern mit denselben Endziffern (abweichende oder fehlende Vorwahlen)."""
+    normalized = normalize_phone_number(number)
+    if not normalized:
+        return []
+    conditions = ['''cell_number_normalized = :normalized''']
+    parameters = {'normalized': normalized}
+    if len(normalized) >= PHONE_SUFFIX_LENGTH:
+        reversed_number = normalized[::-1]
+        # gespeicherte Nummern, die auf dieselben Endziffern enden (Präfixsuche auf der rückwärts geschriebenen
+        # Nummer; ':' folgt in ASCII direkt auf '9')
+        conditions.append('''(cell_number_reversed >= :suffix AND cell_number_reversed < :suffix || ':')''')
+        parameters['suffix'] = reversed_number[:PHONE_SUFFIX_LENGTH]
+        # kürzere gespeicherte Nummern ohne Vorwahl, die selbst das Ende der gesuchten Nummer bilden
+        short_suffixes = [reversed_number[:length] for length in range(6, PHONE_SUFFIX_LENGTH)]
+        conditions.append(f'''cell_number_reversed IN ({", ".join(f":short_{index}" for index in
+                                                                    range(len(short_suffixes)))})''')
+        parameters.update({f'short_{index}': suffix for index, suffix in enumerate(short_suffixes)})
+    cursor = db.execute(f'''SELECT person_id FROM cell_number_field WHERE {" OR ".join(conditions)}
+    ORDER BY cell_number_normalized = :normalized DESC;''', parameters)
+    return list(dict.fromkeys(row[0] for row in cursor.fetchall()))  # doppelte IDs entfernen, Reihenfolge behalten
+
+
+def find_person_ids_by_email(db, address: str) -> [int]:
+    """IDs der Personen mit dieser E-Mail-Adresse (ohne Beachtung der Groß-/Kleinschreibung)."""
+    address = normalize_email(address)
+    if not address:
+        return []
+    cursor = db.execute('''SELECT DISTINCT person_id FROM custom_field WHERE email_normalized = ?;''', (address,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def find_person_ids_by_domain(db, domain: str) -> [int]:
+    """IDs der Personen mit einer E-Mail-Adresse in dieser Domain oder einer ihrer Subdomains; domain darf auch eine
+    E-Mail-Adresse sein ("example.com", "@example.com", "anna@example.com")."""
+    domain_key = reversed_email_domain(domain)
+    if not domain_key:
+        return []
+    # alle Schlüssel mit dem Präfix "com.example." liegen vor "com.example/" ('/' folgt in ASCII direkt auf '.')
+    cursor = db.execute('''SELECT DISTINCT person_id FROM custom_field
+    WHERE email_domain_reversed >= ? AND email_domain_reversed < ? ORDER BY person_id;''',
+                        (domain_key, domain_key[:-1] + '/'))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_contact_group_by_group_id(db, group_id, summary_only=False, lazy_loader=None):
+    """Erzeugen eines ContactGroupVO-Objektes aus den Daten in der Datenbank.
+
+    Die Mitglieder werden unabhängig von ihrer Anzahl mit einer festen Anzahl von Abfragen geladen. Mit
+    summary_only=True werden nur die Personen-Spalten (ohne Adressen, Telefonnummern und benutzerdefinierte Felder)
+    geladen, z. B. für Listenansichten. Mit lazy_loader werden die Mitglieder wie bei load_persons ohne ihre
+    Kind-Sammlungen geladen, auch ohne groups."""
     cursor = db.cursor()
     # Alle Attribute für zugehörige ContactGroup aus der Datenbank holen
     cursor.execute('''SELECT group_id, title FROM contact_group WHERE group_id = ?;''', (group_id,))
@@ -309,39 +1190,26 @@ def get_contact_group_by_group_id(db, group_id):
 
     if group_data_set:
         group_data_set = group_data_set[0]  # ContactGroup-Daten-Tupel aus der einelementigen Liste extrahieren
-        # Holen aller IDs der ContactGroup zugehörigen PersonVOs
-        cursor.execute('''SELECT person_id FROM belongs_to WHERE group_id = ?;''',
-                       (group_id,))
-        person_ids = cursor.fetchall()
-        persons = []
-        for person_id in person_ids:
-            person_id = person_id[0]  # ID aus der einelementigen Liste extrahieren
-            cursor.execute(
-                '''SELECT person_id, last_name, first_name, birthdate, modification_date FROM person WHERE person_id = ?;''',
-                (person_id,))
-            person_data = cursor.fetchall()[0]  # Person-Daten-Tupel aus der einelementigen Liste extrahieren
-
-            # PersonVO-Objekt aus Daten zusammenstellen
-            # Adress-, Telefonnummer-, und benutzerdefinierte Felder werden erst später hinzugefügt,
-            # da für deren Erzeugen ein existierendes PersonVO-Objekt bestehen muss
-            person = PersonVO(person_id=person_data[0], last_name=person_data[1], first_name=person_data[2],
-                              birthdate=person_data[3], modification_date=person_data[4],
-                              addresses=[], cell_number_fields=[],
-                              custom_fields=[])
-            addresses = get_addresses_by_person(db, person)
-            cell_number_fields = get_cell_number_fields_by_person(db, person)
-            custom_fields = get_custom_fields_by_person(db, person)
-            # Hinzufügen der gerade erzeugten Listen aus Adressen, Telefonnummern und benutzerdefinierten Feldern
-            # Das groups-Feld bleibt leer, da ein Aufruf zum Holen der ContactGroups in einer sich immer wieder
-            # aufrufenden Schleife enden würde (diese Funktion würde wiederum eine weitere Funktion aufrufen,
-            # die wieder nach den Personen dieser ContactGroups fragen würde).
-            person.addresses = addresses
-            person.cell_number_fields = cell_number_fields
-            person.custom_fields = custom_fields
-            persons.append(person)  # Person zur Liste der Personen der ContactGroup hinzufügen
+        if lazy_loader is not None:
+            contact_group = ContactGroupVO.from_row(*group_data_set)
+            # ohne from_row(persons=...), das die Gruppe in groups jedes Mitglieds einträgt und diese dazu laden würde
+            contact_group.persons = load_persons(db, '''SELECT person_id FROM belongs_to WHERE group_id = ?''',
+                                                 (group_id,), lazy_loader=lazy_loader)
+            return contact_group
+        if summary_only:
+            # Mitglieder über einen Join in einer einzigen Abfrage holen
+            cursor.execute('''SELECT person.person_id, last_name, first_name, birthdate, modification_date
+            FROM belongs_to JOIN person ON person.person_id = belongs_to.person_id
+            WHERE belongs_to.group_id = ? ORDER BY ifnull(person.sort_key, ''), person.person_id;''', (group_id,))
+            persons = [PersonVO.from_row(*person_data) for person_data in cursor.fetchall()]
+        else:
+            # Das groups-Feld der Mitglieder wird nicht aus der Datenbank befüllt, da ein Aufruf zum Holen der
+            # ContactGroups in einer sich immer wieder aufrufenden Schleife enden würde; es enthält nur diese Gruppe.
+            persons = load_persons(db, '''SELECT person_id FROM belongs_to WHERE group_id = ?''', (group_id,),
+                                   with_groups=False)
 
         # ContactGroupVO-Objekt mit den gewonnenen Personen erzeugen
-        contact_group = ContactGroupVO(group_id=group_data_set[0], title=group_data_set[1], persons=persons)
+        contact_group = ContactGroupVO.from_row(*group_data_set, persons=persons)
         return contact_group
     else:
         # Exception werfen, wenn Eintrag mit gegebener ID nicht existiert
@@ -374,10 +1242,7 @@ def get_addresses_by_person(db, person) -> [AddressVO]:
     address_data_sets = cursor.fetchall()
     for address_data in address_data_sets:
         # Für jedes Adress-Datentupel ein AddressVO-Objekt erstellen
-        addresses.append(
-            AddressVO(address_id=address_data[0], label=address_data[1], street=address_data[2],
-                      house_number=address_data[3],
-                      zip_code=address_data[4], town=address_data[5], person=person))
+        addresses.append(AddressVO.from_row(person, *address_data))
     return addresses  # erstellte Liste der Adressen zurückgeben
 
 
@@ -393,9 +1258,7 @@ def get_cell_number_fields_by_person(db, person) -> [CellNumberFieldVO]:
     cell_number_fields_data_sets = cursor.fetchall()
     for cell_number_field_data in cell_number_fields_data_sets:
         # Für jedes Telefonnummern-Datentupel ein CellNumberFieldVO-Objekt erstellen
-        cell_number_fields.append(CellNumberFieldVO(cell_number_id=cell_number_field_data[0],
-                                                    label=cell_number_field_data[1],
-                                                    cell_number=cell_number_field_data[2], person=person))
+        cell_number_fields.append(CellNumberFieldVO.from_row(person, *cell_number_field_data))
     return cell_number_fields  # erstellte Liste der Telefonnummern-Felder zurückgeben
 
 
@@ -411,10 +1274,7 @@ def get_custom_fields_by_person(db, person) -> [CustomFieldVO]:
     custom_fields_data_sets = cursor.fetchall()
     for custom_field_data in custom_fields_data_sets:
         # Für jedes Datentupel eines benutzerdefinierte Feldes ein CustomFieldVO-Objekt erstellen
-        custom_fields.append(
-            CustomFieldVO(field_id=custom_field_data[0], label=custom_field_data[1],
-                          field_value=custom_field_data[2], v_type=custom_field_data[3],
-                          person=person))
+        custom_fields.append(CustomFieldVO.from_row(person, *custom_field_data))
     return custom_fields  # erstellte Liste der benutzerdefinierten Felder zurückgeben
 
 
@@ -541,8 +1401,12 @@ def update_custom_field(db,
         SET label = ?,
             field_value = ?,
             v_type = ?,
+            email_normalized = ?,
+            email_domain_reversed = ?
         WHERE field_id = ?;''',
-                       (custom_field.label, custom_field.field_value, custom_field.v_type, custom_field.field_id))
+                       (custom_field.label, custom_field.field_value, custom_field.v_type) +
+                       tuple(function(custom_field) for column, function in CUSTOM_FIELD_DERIVED_COLUMNS) +
+                       (custom_field.field_id,))
         db.commit()  # Änderungen bestätigen
     else:
         # Exception werfen, wenn keine zum CustomFieldVO-Objekt gehörende Entität existiert.
@@ -557,9 +1421,13 @@ def update_cell_number_field(db,
         # Alle Felder neu setzen
         cursor.execute('''UPDATE cell_number_field
         SET label = ?,
-            cell_number = ?
+            cell_number = ?,
+            cell_number_normalized = ?,
+            cell_number_reversed = ?
         WHERE cell_number_id = ?''',
-                       (cell_number_field.label, cell_number_field.cell_number, cell_number_field.cell_number_id))
+                       (cell_number_field.label, cell_number_field.cell_number) +
+                       tuple(function(cell_number_field) for column, function in CELL_NUMBER_DERIVED_COLUMNS) +
+                       (cell_number_field.cell_number_id,))
         db.commit()  # Änderungen bestätigen
     else:
         # Exception werfen, wenn keine zum CellNumberField-Objekt gehörende Entität existiert.
@@ -570,103 +1438,181 @@ def update_person(db,
                   person: PersonVO):  # Datentyp für Autovervollständigung und besserer Lesbarkeit des Codes angegeben
     """Aktualisieren der Attributwerte der zum PersonVO-Objekt gehörenden Entität"""
     if check_entity_existence(db, person):
-        cursor = db.cursor()
-        # Attributwerte der Person-Entität neu setzen
-        cursor.execute('''UPDATE person
-        SET modification_date = ?,
-            last_name = ?,
-            first_name = ?,
-            birthdate = ?
-        WHERE person_id = ?''', (
-            person.modification_date, person.last_name, person.first_name, person.birthdate, person.person_id))
-
-        # IDs der in der Datenbank abgespeicherten ContactGroups erhalten um sie mit denen der Person zu vergleichen
-        cursor.execute('''SELECT group_id FROM belongs_to WHERE person_id = ?''', (person.person_id,))
-        group_ids_in_db = [group_id_tuple[0] for group_id_tuple in cursor.fetchall()]
-        if person.groups:
-            person_group_ids = [group.group_id for group in person.groups]
-        else:
-            person_group_ids = []
-        for db_group_id in group_ids_in_db:
-            if db_group_id not in person_group_ids:
-                # Beziehungen in der Datenbank löschen, die im PersonVO-Objekt gelöscht wurden
-                cursor.execute('''DELETE FROM belongs_to WHERE group_id = ? and person_id = ?;''',
-                               (db_group_id, person.person_id))
-        for person_group_id in person_group_ids:
-            if person_group_id not in group_ids_in_db:
-                # Beziehungen zur Datenbank hinzufügen, die im PersonVO-Objekt neu hinzugekommen sind
-                cursor.execute('''INSERT INTO belongs_to (group_id, person_id) VALUES (?, ?);''',
-                               (person_group_id, person.person_id))
-
-        # update addresses
-        # IDs der in der Datenbank abgespeicherten Adressen erhalten um sie mit den Adressen der Person zu vergleichen
-        cursor.execute('''SELECT address_id FROM address WHERE person_id = ?''', (person.person_id,))
-        address_ids_in_db = [address_id_tuple[0] for address_id_tuple in cursor.fetchall()]
-        if person.addresses:
-            person_addresses = [address for address in person.addresses]
-            person_address_ids = [address.address_id for address in person_addresses]
+        original_ids = get_assigned_ids([person])
+        begin_write_transaction(db)
+        try:
+            cursor = db.cursor()
+            # Attributwerte der Person-Entität neu setzen
+            cursor.execute('''UPDATE person
+            SET modification_date = ?,
+                last_name = ?,
+                first_name = ?,
+                birthdate = ?,
+                sort_key = ?
+            WHERE person_id = ?''', (
+                person.modification_date, person.last_name, person.first_name, person.birthdate) +
+                           tuple(function(person) for column, function in PERSON_DERIVED_COLUMNS) + (person.person_id,))
+            update_child_rows(db, person)
+            db.commit()  # alle Änderungen der Person gemeinsam bestätigen
+        except BaseException:
+            db.rollback()
+            restore_ids(original_ids)  # von update_child_table vergebene IDs zurücksetzen
+            raise
+    else:
+        # Exception werfen, wenn keine zum PersonVO-Objekt gehörende Entität existiert.
+        raise NoSuchEntityException('The specifed entity does not exist in the database')
+
+
+def update_child_rows(db, person: PersonVO, new_person=False):
+    """Gruppenzugehörigkeiten, Adressen, Telefonnummern und benutzerdefinierte Felder der Person mit der Datenbank
+    abgleichen. Nur hinzugekommene, entfernte und tatsächlich geänderte Einträge werden geschrieben; noch nicht
+    geladene Sammlungen einer verzögert geladenen Person können nicht verändert sein und werden übersprungen."""
+    cursor = db.cursor()
+    if person.is_loaded('groups'):
+        # Gruppenzugehörigkeiten per Mengendifferenz abgleichen (eine neue Person hat noch keine)
+        if new_person:
+            group_ids_in_db = set()
         else:
-            person_addresses = []
-            person_address_ids = []
-        for db_address_id in address_ids_in_db:
-            if db_address_id not in person_address_ids:
-                # Adressen aus der Datenbank löschen, die aus dem PersonVO-Objekt entfernt wurden
-                cursor.execute('''DELETE FROM address WHERE address_id = ?''', (db_address_id,))
-        for person_address in person_addresses:
-            # für jedes Aktualisieren der Person auch die Adressen aktualisieren (neu einfügen oder aktualisieren)
-            try:
-                insert_address(db, person_address)
-            except EntityAlreadyExistsException:
-                update_address(db, person_address)
-
-        # update cell_number_fields
-        # IDs der in der Datenbank abgespeicherten Telefonnummern erhalten um sie mit den Telefonnummern der Person zu vergleichen
-        cursor.execute('''SELECT cell_number_id FROM cell_number_field WHERE person_id = ?''', (person.person_id,))
-        cell_number_ids_in_db = [cell_number_id_tuple[0] for cell_number_id_tuple in cursor.fetchall()]
-        if person.cell_number_fields:
-            person_cell_number_fields = [cell_number_field for cell_number_field in person.cell_number_fields]
-            person_cell_number_ids = [cell_number_field.cell_number_id for cell_number_field in
-                                      person_cell_number_fields]
+            cursor.execute('''SELECT group_id FROM belongs_to WHERE person_id = ?''', (person.person_id,))
+            group_ids_in_db = {group_id_tuple[0] for group_id_tuple in cursor.fetchall()}
+        person_group_ids = {group.group_id for group in person.groups if group.group_id is not None}
+        # Beziehungen in der Datenbank löschen, die im PersonVO-Objekt gelöscht wurden
+        cursor.executemany('''DELETE FROM belongs_to WHERE group_id = ? and person_id = ?;''',
+                           [(group_id, person.person_id) for group_id in group_ids_in_db - person_group_ids])
+        # Beziehungen hinzufügen, die im PersonVO-Objekt neu hinzugekommen sind (nur zu existierenden Gruppen)
+        cursor.executemany('''INSERT INTO belongs_to (group_id, person_id)
+        SELECT ?1, ?2 WHERE EXISTS (SELECT 1 FROM contact_group WHERE group_id = ?1)
+        ON CONFLICT (group_id, person_id) DO NOTHING;''',
+                           [(group_id, person.person_id) for group_id in person_group_ids - group_ids_in_db])
+
+    if person.is_loaded('addresses'):
+        update_child_table(db, person, 'address', 'address_id',
+                           ('label', 'street', 'house_number', 'zip_code', 'town'), person.addresses, new_person)
+    if person.is_loaded('cell_number_fields'):
+        update_child_table(db, person, 'cell_number_field', 'cell_number_id', ('label', 'cell_number'),
+                           person.cell_number_fields, new_person, CELL_NUMBER_DERIVED_COLUMNS)
+    if person.is_loaded('custom_fields'):
+        update_child_table(db, person, 'custom_field', 'field_id', ('label', 'field_value', 'v_type'),
+                           person.custom_fields, new_person, CUSTOM_FIELD_DERIVED_COLUMNS)
+
+
+def update_child_table(db, person: PersonVO, table: str, id_column: str, columns: tuple, entities: list,
+                       new_person=False, derived_columns=()):
+    """Kind-Einträge einer Tabelle mit den Objekten der Person abgleichen (Hash-basiert, ein DELETE und ein Upsert per
+    executemany). Die Attributnamen der Objekte entsprechen den Spaltennamen; derived_columns enthält
+    (Spaltenname, Funktion)-Paare für Spalten, die beim Schreiben aus dem Objekt berechnet werden."""
+    cursor = db.cursor()
+
+    def entity_values(entity):
+        return (tuple(getattr(entity, column) for column in attribute_columns) +
+                tuple(function(entity) for column, function in derived_columns))
+
+    attribute_columns = columns
+    columns = attribute_columns + tuple(column for column, function in derived_columns)  # alle geschriebenen Spalten
+
+    if new_person:
+        rows_in_db = {}  # eine neue Person hat noch keine Einträge, die Abfrage kann entfallen
+    else:
+        cursor.execute(f'''SELECT {id_column}, {", ".join(columns)} FROM {table} WHERE person_id = ?;''',
+                       (person.person_id,))
+        rows_in_db = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+    kept_ids = set()
+    upsert_rows = []
+    new_entities = []
+    for entity in entities:
+        entity_id = getattr(entity, id_column)
+        values = entity_values(entity)
+        if entity_id in rows_in_db:
+            if entity_id not in kept_ids and rows_in_db[entity_id] != values:
+                # nur tatsächlich geänderte Einträge aktualisieren
+                upsert_rows.append((entity_id,) + values + (person.person_id,))
+            kept_ids.add(entity_id)
         else:
-            person_cell_number_fields = []
-            person_cell_number_ids = []
-        for db_cell_number_id in cell_number_ids_in_db:
-            if db_cell_number_id not in person_cell_number_ids:
-                # Telefonnummern aus der Datenbank löschen, die aus dem PersonVO-Objekt entfernt wurden
-                cursor.execute('''DELETE FROM cell_number_field WHERE cell_number_id = ?''', (db_cell_number_id,))
-        for person_cell_number_field in person_cell_number_fields:
-            # für jedes Aktualisieren der Person auch die Telefonnummern aktualisieren (neu einfügen oder aktualisieren)
-            try:
-                insert_cell_number_field(db, person_cell_number_field)
-            except EntityAlreadyExistsException:
-                update_cell_number_field(db, person_cell_number_field)
-
-        # update custom_fields
-        # IDs der in der Datenbank abgespeicherten benutzerdefinierten Felder erhalten um sie mit denen der Person zu vergleichen
-        cursor.execute('''SELECT field_id FROM custom_field WHERE person_id = ?''', (person.person_id,))
-        field_ids_in_db = [field_id_tuple[0] for field_id_tuple in cursor.fetchall()]
-        if person.custom_fields:
-            person_custom_fields = [custom_field for custom_field in person.custom_fields]
-            person_custom_field_ids = []
+            new_entities.append(entity)  # neue (oder nicht zur Person gehörende) Einträge neu einfügen
+
+    # Einträge aus der Datenbank löschen, die aus dem PersonVO-Objekt entfernt wurden
+    cursor.executemany(f'''DELETE FROM {table} WHERE {id_column} = ?;''',
+                       [(entity_id,) for entity_id in rows_in_db.keys() - kept_ids])
+    if new_entities:
+        # IDs selbst vergeben (Schreibsperre wird gehalten), damit sie ohne lastrowid pro Zeile bekannt sind
+        next_id = get_next_id(db, table, id_column)
+        for entity in new_entities:
+            setattr(entity, id_column, next_id)  # ID auch in das Objekt eintragen
+            upsert_rows.append((next_id,) + entity_values(entity) + (person.person_id,))
+            next_id += 1
+    # geänderte und neue Einträge mit derselben Anweisung schreiben
+    cursor.executemany(f'''INSERT INTO {table} ({id_column}, {", ".join(columns)}, person_id)
+    VALUES ({", ".join("?" * (len(columns) + 2))})
+    ON CONFLICT ({id_column}) DO UPDATE SET {", ".join(column + " = excluded." + column for column in columns)};''',
+                       upsert_rows)
+
+
+def upsert_person(db, person: PersonVO) -> int:
+    """PersonVO-Objekt einfügen oder, wenn die ID bereits existiert, aktualisieren (INSERT ... ON CONFLICT DO UPDATE)
+    und die Kind-Einträge abgleichen; ohne vorherige Existenzprüfung. Gibt die ID der Person zurück."""
+    if type(person) != PersonVO:
+        raise IllegalEntityTypeException('The entity must be of type PersonVO')
+    if person.modification_date is None:
+        person.modification_date = int(time.time())  # Änderung dann dokumentieren, wenn Daten gesetzt werden
+    original_person_id = person.person_id
+    original_ids = get_assigned_ids([person])  # auch die IDs der Kind-Einträge, update_child_table vergibt neue
+    begin_write_transaction(db)
+    try:
+        cursor = db.cursor()
+        cursor.execute('''INSERT INTO person (person_id, modification_date, last_name, first_name, birthdate, sort_key)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (person_id) DO UPDATE SET
+            modification_date = excluded.modification_date,
+            last_name = excluded.last_name,
+            first_name = excluded.first_name,
+            birthdate = excluded.birthdate,
+            sort_key = excluded.sort_key;''', (
+            person.person_id, person.modification_date, person.last_name, person.first_name, person.birthdate) +
+                       tuple(function(person) for column, function in PERSON_DERIVED_COLUMNS))
+        if original_person_id is None:
+            person.person_id = cursor.lastrowid  # ID auch in das PersonVO-Objekt eintragen
+        update_child_rows(db, person, new_person=original_person_id is None)
+        db.commit()  # Person und Kind-Einträge gemeinsam bestätigen
+    except BaseException:
+        db.rollback()
+        restore_ids(original_ids)  # Objekte nicht auf verworfene IDs verweisen lassen
+        raise
+    return person.person_id
+
+
+def upsert_contact_group(db, contact_group: ContactGroupVO) -> int:
+    """ContactGroupVO-Objekt einfügen oder, wenn die ID bereits existiert, aktualisieren (INSERT ... ON CONFLICT DO
+    UPDATE) und die Mitglieder per Mengendifferenz abgleichen. Gibt die ID der ContactGroup zurück."""
+    if type(contact_group) != ContactGroupVO:
+        raise IllegalEntityTypeException('The entity must be of type ContactGroupVO')
+    original_group_id = contact_group.group_id
+    begin_write_transaction(db)
+    try:
+        cursor = db.cursor()
+        cursor.execute('''INSERT INTO contact_group (group_id, title) VALUES (?, ?)
+        ON CONFLICT (group_id) DO UPDATE SET title = excluded.title;''', (contact_group.group_id, contact_group.title))
+        if original_group_id is None:
+            contact_group.group_id = cursor.lastrowid  # ID auch in das ContactGroupVO-Objekt eintragen
+            person_ids_in_db = set()
         else:
-            person_custom_fields = []
-            person_custom_field_ids = []
-        for db_custom_field_id in field_ids_in_db:
-            # benutzerdefinierte Felder aus der Datenbank löschen, die aus dem PersonVO-Objekt entfernt wurden
-            if db_custom_field_id not in person_custom_field_ids:
-                cursor.execute('''DELETE FROM custom_field WHERE field_id = ?''', (db_custom_field_id,))
-
-        for person_custom_field in person_custom_fields:
-            # für jedes Aktualisieren der Person auch die benutzerdefinierten Felder aktualisieren (neu einfügen oder aktualisieren)
-            try:
-                insert_custom_field(db, person_custom_field)
-            except EntityAlreadyExistsException:
-                update_custom_field(db, person_custom_field)
-
+            cursor.execute('''SELECT person_id FROM belongs_to WHERE group_id = ?;''', (contact_group.group_id,))
+            person_ids_in_db = {person_id_tuple[0] for person_id_tuple in cursor.fetchall()}
+        group_person_ids = {person.person_id for person in contact_group.persons if person.person_id is not None}
+        # Beziehungen in der Datenbank löschen, die im ContactGroup-Objekt gelöscht wurden
+        cursor.executemany('''DELETE FROM belongs_to WHERE person_id = ? and group_id = ?;''',
+                           [(person_id, contact_group.group_id) for person_id in person_ids_in_db - group_person_ids])
+        # Beziehungen hinzufügen, die im ContactGroup-Objekt neu hinzugekommen sind (nur zu existierenden Personen)
+        cursor.executemany('''INSERT INTO belongs_to (group_id, person_id)
+        SELECT ?1, ?2 WHERE EXISTS (SELECT 1 FROM person WHERE person_id = ?2)
+        ON CONFLICT (group_id, person_id) DO NOTHING;''',
+                           [(contact_group.group_id, person_id) for person_id in group_person_ids - person_ids_in_db])
         db.commit()
-    else:
-        # Exception werfen, wenn keine zum PersonVO-Objekt gehörende Entität existiert.
-        raise NoSuchEntityException('The specifed entity does not exist in the database')
+    except BaseException:
+        db.rollback()
+        contact_group.group_id = original_group_id
+        raise
+    return contact_group.group_id
 
 
 def update_contact_group(db,
@@ -24,3 +24,17 @@ class IllegalEntityTypeException(Exception):
 
     def __init__(self, message='The given Entity type is not allowed'):
         super().__init__(message)
+
+
+class ConnectionPoolExhaustedException(Exception):
+    """Exception zum Anzeigen, dass innerhalb der Wartezeit keine Datenbankverbindung frei geworden ist."""
+
+    def __init__(self, message='No database connection available in the pool'):
+        super().__init__(message)
+
+
+class TransactionAbortedException(Exception):
+    """Exception zum Anzeigen, dass eine Arbeitseinheit (Transaktion) zurückgerollt und nicht bestätigt wurde."""
+
+    def __init__(self, message='The transaction has been rolled back'):
+        super().__init__(message)
@@ -13,6 +13,10 @@ import contact_management
 import threading
 from datetime import datetime, timezone
 
+PERSON_PAGE_SIZE = 100  # so viele Personen werden pro Seite in die Kontaktliste geladen
+LATEST_CONTACTS_PERIOD = 86400 * 14  # Zeitraum der generischen Gruppe "Letzte 14 Tage" in Sekunden
+CHANGE_POLL_INTERVAL = 2000  # so viele ms zwischen zwei Prüfungen, ob ein anderes Programm die Datenbank geändert hat
+
 
 class AddressWindow:
     """Fenster um Adresse zu erstellen oder zu bearbeiten."""
@@ -355,13 +359,28 @@ class ContactListWindow:
     """Das Fenster für Kontaktlisten"""
 
     #
-    def __init__(self):
-        """Hauptfenster erstellen und nötige Funktionen aufrufen"""
+    def __init__(self, change_poll_interval=CHANGE_POLL_INTERVAL):
+        """Hauptfenster erstellen und nötige Funktionen aufrufen; mit change_poll_interval=None wird nicht
+        regelmäßig auf Änderungen durch andere Programme geprüft"""
         self.root = Tk()
         self.contact_groups = []
         self.contact_group_titles = []
         self.selected_contact_group = None
         self.selected_contact_group_title = StringVar()
+        self.search_text = StringVar()  # Suchbegriff für die Suche in der Kontaktliste
+        self.search_after_id = None  # geplante Aktualisierung der Tabelle nach der letzten Eingabe ins Suchfeld
+        self.all_contacts_group = None  # generische Gruppe "Alle Kontakte", ihre Personen werden seitenweise geladen
+        self.latest_contact_group = None  # generische Gruppe "Letzte 14 Tage", ihre Personen werden beim Anzeigen geholt
+        self.person_pages = None  # noch nicht geladene Seiten der Kontaktliste (None, wenn alle geladen sind)
+        self.loaded_page_count = 0  # Anzahl der bereits in die Tabelle geladenen Seiten
+        self.reloading = False  # während update() löst das Setzen des Gruppentitels kein Neuladen der Tabelle aus
+        self.person_page_after_id = None  # geplantes Laden der nächsten Seite
+        # (Gruppe, Stand der Datenbank, IDs) des Filters für Suchtreffer, damit nicht jeder Tastendruck die Mitglieder
+        # der ausgewählten Gruppe erneut abfragt
+        self.search_filter = None
+        # Stand der Datenbank, den das Fenster anzeigt; vor dem Aufbau abgefragt, damit keine Änderung verloren geht
+        self.displayed_data_version = contact_management.get_data_version()
+        self.change_poll_interval = change_poll_interval
         self.root.title('Kontaktbuch')
         self.contact_group_options_have_been_setup = False
 
@@ -377,19 +396,22 @@ class ContactListWindow:
         self.footer_frame.pack(side=BOTTOM, fill=X)
         self.footer_frame.pack(anchor=W, padx=2, pady=2, fill=X)
 
-        self.selected_contact_group_title.trace('w', lambda *args: self.update_person_table())
+        self.selected_contact_group_title.trace('w', lambda *args: self.contact_group_title_changed())
+        self.search_text.trace('w', lambda *args: self.schedule_search())
         self.person_table_frame.pack(fill=BOTH, expand=True)
         self.center_window()
+        if change_poll_interval is not None:
+            self.root.after(change_poll_interval, self.poll_for_changes)
         self.root.mainloop()
 
     def build_header(self, frame):
         """Header erstellen"""
-        contact_groups_option_menu = OptionMenu(frame, self.selected_contact_group_title,
-                                                [])  # Dropdown-Menu für Gruppenauswahl
-        contact_groups_option_menu.grid(row=1, column=1)
+        # Dropdown-Menu für Gruppenauswahl; es wird einmal erstellt und bei jeder Aktualisierung wiederverwendet
+        self.contact_groups_option_menu = OptionMenu(frame, self.selected_contact_group_title, [])
+        self.contact_groups_option_menu.grid(row=1, column=1)
         delete_contact_group_button = Button(frame, text='Gruppe bearbeiten',
-                                             command=lambda *args: ContactGroupWindow(self,
-                                                                                      contact_group=self.selected_contact_group))
+                                             command=lambda *args: ContactGroupWindow(
+                                                 self, contact_group=self.editable_contact_group()))
         delete_contact_group_button.grid(row=1, column=3)
         new_contact_button = Button(frame, text='Neuer Kontakt', command=lambda *args: PersonWindow(self))
         new_contact_button.grid(row=1, column=5)
@@ -401,13 +423,28 @@ class ContactListWindow:
         frame.columnconfigure(6, minsize=5)
         frame.rowconfigure(0, minsize=3)
         frame.rowconfigure(2, minsize=3)
+        # Suchfeld unter den Buttons; die Tabelle zeigt dann nur die Treffer der ausgewählten Gruppe
+        search_entry = Entry(frame, textvariable=self.search_text)
+        search_entry.grid(row=3, column=1, columnspan=5, sticky=EW)
+        frame.rowconfigure(4, minsize=3)
 
     def build_table(self, frame):
         person_table = ttk.Treeview(frame, height=25, show='tree')
         person_table.bind('<Double-1>', lambda event: self.on_doubleclick())
+        scrollbar = ttk.Scrollbar(frame, orient=VERTICAL, command=person_table.yview)
+        # Die Tabelle meldet jede Änderung des sichtbaren Bereichs; kommt das Ende in Sicht, wird nachgeladen
+        person_table.configure(yscrollcommand=lambda first, last: self.person_table_scrolled(scrollbar, first, last))
+        scrollbar.pack(side=RIGHT, fill=Y)
         person_table.pack(fill=BOTH, expand=True)
         self.update_person_table()
 
+    def editable_contact_group(self):
+        """Die ausgewählte Gruppe zum Bearbeiten: die Gruppen im Dropdown-Menu haben keine Mitglieder, beim Speichern
+        würden sie sonst aus der Gruppe entfernt; daher wird die Gruppe samt Mitgliedern geholt"""
+        if self.selected_contact_group.group_id:
+            return contact_management.get_contact_group_by_id(self.selected_contact_group.group_id)
+        return self.selected_contact_group
+
     def build_footer(self, frame):
 
         import_button = Button(frame, text='VCF Importieren',
@@ -424,46 +461,85 @@ class ContactListWindow:
         frame.columnconfigure(4, minsize=5)
 
     def export_button_pressed(self):
-        vcard.export_persons(fd.askdirectory(), self.selected_contact_group)
+        # Die Gruppen im Dropdown-Menu enthalten keine Personen, für den Export werden die vollständigen Personen
+        # samt Adressen, Telefonnummern und Feldern erst jetzt geholt
+        contact_group = self.selected_contact_group
+        if contact_group.group_id:
+            persons = contact_management.get_persons_by_contact_group(contact_group)
+        elif contact_group is self.latest_contact_group:
+            # nur die Kind-Einträge der exportierten Personen laden, gemeinsam mit einer Abfrage je Tabelle
+            latest_person_ids = self.get_latest_person_ids()
+            persons = [person for person in contact_management.get_all_persons(lazy=True)
+                       if person.person_id in latest_person_ids]
+            contact_management.prefetch(persons)
+        else:
+            persons = contact_management.get_all_persons()
+        # die Gruppe dient nur als Hülle für den Export; die Personen werden nicht über den Konstruktor übergeben,
+        # der sie um die Gruppe ergänzen würde (es können gecachte Objekte sein)
+        export_group = ContactGroupVO(title=contact_group.title)
+        export_group.persons = persons
+        vcard.export_persons(fd.askdirectory(), export_group)
 
     def import_button_pressed(self):
         vcard.import_persons(fd.askopenfile(filetypes=[('VCF Files', '*.vcf')]))
-        self.update()
+        # läuft in einem eigenen Thread: Tk ist nicht threadsicher, die Tabelle wird im Haupt-Thread neu geladen
+        self.root.after(0, self.update)
 
     def update(self):
-        self.update_contact_group_option_menu()
-        self.update_person_table()
-
-    def update_contact_group_option_menu(self):
-        """Aktualisieren der Gruppen-Optionen im Dropdown-Menu"""
-        # generische Gruppe mit allen Kontakten erstellen, lexikalisch sortiert nach Nachname + Vorname
-        all_contacts_group = ContactGroupVO(title='Alle Kontakte',
-                                            persons=sorted(contact_management.get_all_persons(),
-                                                           key=lambda person: (
-                                                                   person.last_name + person.first_name).replace(
-                                                               ' ', ''), reverse=False))
-        # generische Gruppe mit Kontakten der letzten 14 Tage erstellen, absteigend sortiert nach Änderungsdatum
-        latest_contact_group = ContactGroupVO(title='Letzte 14 Tage',
-                                              persons=[person for person in sorted(contact_management.get_all_persons(),
-                                                                                   key=lambda
-                                                                                       person: person.modification_date,
-                                                                                   reverse=True) if
-                                                       time.time() - person.modification_date < 86400 * 14])
-        self.selected_contact_group = all_contacts_group  # standardmäßig ausgewählte Gruppe auf generisch erzeugte Gruppe "Alle Kontakte" setzen
-        # Liste der auswählbaren Gruppen = Liste aller Gruppen in der Datenbank + alle generischen Gruppen
-        self.contact_groups = [all_contacts_group, latest_contact_group] + contact_management.get_all_contact_groups()
+        """Gruppen und Tabelle neu laden, aber nur, wenn sich die Datenbank seit dem letzten Aufbau geändert hat.
+        Ausgewählte Gruppe, Suchbegriff, Anzahl der geladenen Seiten und Scrollposition bleiben erhalten, damit
+        z. B. ein laufender Import in einem anderen Programm das Fenster nicht ständig zurücksetzt. Nur im Haupt-Thread
+        aufrufen (andere Threads mit self.root.after(0, self.update)): Tk ist nicht threadsicher."""
+        data_version = contact_management.get_data_version()
+        if data_version == self.displayed_data_version:
+            return
+        self.displayed_data_version = data_version
+        person_table = self.person_table_frame.winfo_children()[0]
+        first_visible, _ = person_table.yview()
+        page_count = self.loaded_page_count
+        self.reloading = True
+        try:
+            self.update_contact_group_option_menu(keep_selection=True)
+        finally:
+            self.reloading = False
+        self.update_person_table(page_count)
+        person_table.yview_moveto(first_visible)
+
+    def poll_for_changes(self):
+        """Regelmäßig prüfen, ob z. B. ein anderer Prozess die Datenbank geändert hat; das kostet nur ein PRAGMA"""
+        self.update()
+        self.root.after(self.change_poll_interval, self.poll_for_changes)
+
+    def update_contact_group_option_menu(self, keep_selection=False):
+        """Aktualisieren der Gruppen-Optionen im Dropdown-Menu; mit keep_selection=True bleibt die ausgewählte Gruppe
+        ausgewählt (anhand ihrer ID), solange es sie noch gibt, sonst wird "Alle Kontakte" ausgewählt"""
+        if self.all_contacts_group is None:
+            # generische Gruppe mit allen Kontakten erstellen; die Personen werden beim Anzeigen seitenweise geholt,
+            # lexikalisch sortiert nach Nachname + Vorname
+            self.all_contacts_group = ContactGroupVO(title='Alle Kontakte')
+            # generische Gruppe mit Kontakten der letzten 14 Tage erstellen, die Personen werden beim Anzeigen
+            # seitenweise geholt, absteigend sortiert nach Änderungsdatum
+            self.latest_contact_group = ContactGroupVO(title='Letzte 14 Tage')
+        previous_contact_group = self.selected_contact_group
+        # Liste der auswählbaren Gruppen = Liste aller Gruppen in der Datenbank + alle generischen Gruppen; für die
+        # Auswahl genügen ID und Titel, die Mitglieder werden seitenweise für die Tabelle geholt
+        self.contact_groups = [self.all_contacts_group, self.latest_contact_group] + \
+                              contact_management.get_contact_groups_without_members()
         self.contact_group_titles = [contact_group.title for contact_group in self.contact_groups]
-        self.selected_contact_group_title.set(
-            self.contact_group_titles[0])  # Titel im Dropdown-Menu auf "Alle Kontakte" setzen
+        # standardmäßig ausgewählte Gruppe auf generisch erzeugte Gruppe "Alle Kontakte" setzen
+        self.selected_contact_group = self.all_contacts_group
+        if keep_selection and previous_contact_group is not None:
+            for contact_group in self.contact_groups:
+                if contact_group is previous_contact_group or (
+                        previous_contact_group.group_id and contact_group.group_id == previous_contact_group.group_id):
+                    self.selected_contact_group = contact_group
+                    break
+        if self.selected_contact_group_title.get() != self.selected_contact_group.title:
+            self.selected_contact_group_title.set(self.selected_contact_group.title)  # Titel im Dropdown-Menu setzen
 
         # Breite des Dropdown-Menus auf die Zeichenlänge des längsten Gruppentitels setzen
         max_option_length = max((len(max(self.contact_group_titles, key=len)), len('Neue Gruppe erstellen')))
-        # für jedes aktualisieren des Dropdown-Menus ein neues erstellen und das alte später verwerfen
-        option_menu_widget = OptionMenu(self.header_frame, self.selected_contact_group_title,
-                                        *self.contact_group_titles)
-        self.header_frame.winfo_children()[0] = option_menu_widget  # neues Optionmenu setzen
-        option_menu_widget.grid(row=1, column=1)
-        menu: Menu = option_menu_widget["menu"]
+        menu: Menu = self.contact_groups_option_menu["menu"]
         menu.delete(0, 'end')  # alle Optionen löschen, um sie gleich neu aufzubauen (mit Kommandos)
         option_count = 0
         for contact_group in self.contact_groups:
@@ -478,10 +554,15 @@ class ContactListWindow:
         # Eintrag, der ein ContactGroupWindow aufruft, um eine neue Gruppe erstellen zu können
         menu.add_command(label='Neue Gruppe erstellen',
                          command=lambda parent=self: ContactGroupWindow(parent=parent))
-        option_menu_widget.config(width=max_option_length)
-        # Nach jedem Aufruf der Funtkion wird die Gruppe "Alle Kontakte" gesetzt.
-        # Diese Gruppe existiert aber nicht wirklich in der Datenbank und kann daher nicht gelöscht werden
-        self.change_contact_group_delete_button_visibility(False)
+        self.contact_groups_option_menu.config(width=max_option_length)
+        # Die generischen Gruppen existieren nicht wirklich in der Datenbank und können daher nicht gelöscht werden
+        self.change_contact_group_delete_button_visibility(self.selected_contact_group.group_id is not None)
+
+    def contact_group_title_changed(self):
+        """Tabelle neu laden, wenn im Dropdown-Menu eine andere Gruppe ausgewählt wurde (nicht während update(),
+        das die Tabelle selbst neu lädt)"""
+        if not self.reloading:
+            self.update_person_table()
 
     def set_command_for_contact_group_option_menu_entry(self, contact_group):
         """Aktion für einen Eintrag im Dropdown-Menu bei dessen Auswahl."""
@@ -504,18 +585,109 @@ class ContactListWindow:
         else:
             delete_button.grid(row=1, column=3)  # ansonsten delete-Button erneut einblenden
 
-    def update_person_table(self):
+    def update_person_table(self, page_count=1):
+        """Tabelle neu füllen, zunächst mit den ersten page_count Seiten"""
         person_table = self.person_table_frame.winfo_children()[0]  # Tabelle aus dem Fenster erhalten
-        for person in person_table.get_children(''):
-            person_table.delete(person)  # Einträge löschen, um Tabelle später mit neuen Einträgen zu füllen
-
-        for person in self.selected_contact_group.persons:
+        # Einträge löschen, um Tabelle später mit neuen Einträgen zu füllen
+        person_table.delete(*person_table.get_children(''))
+        if self.person_page_after_id is not None:
+            self.root.after_cancel(self.person_page_after_id)  # Nachladen der vorherigen Liste abbrechen
+            self.person_page_after_id = None
+        # Es werden nur die ersten Seiten eingefügt, weitere erst, wenn beim Scrollen das Ende in Sicht kommt
+        self.person_pages = self.iterate_person_pages()
+        self.loaded_page_count = 0
+        while self.person_pages is not None and self.loaded_page_count < page_count:
+            if self.person_page_after_id is not None:
+                # eine leere Seite hat das Laden der nächsten geplant, sie wird stattdessen gleich geladen
+                self.root.after_cancel(self.person_page_after_id)
+            self.load_next_person_page()
+
+    def iterate_person_pages(self):
+        """Die anzuzeigenden Personen seitenweise liefern; jede Seite wird erst beim Weiterschalten geholt."""
+        contact_group = self.selected_contact_group
+        if self.search_text.get().strip():
+            # Namensanfänge werden samt Kurzfassungen aus dem Speicher beantwortet; passt kein Name, wird im
+            # Volltextindex (Adressen, Telefonnummern, ...) gesucht. Angezeigt werden nur Treffer aus der ausgewählten
+            # Gruppe, deren Mitglieder bis zur nächsten Änderung der Datenbank gemerkt werden.
+            persons = contact_management.autocomplete_summaries(self.search_text.get()) or \
+                      contact_management.get_indexed_person_summaries(
+                          contact_management.search(self.search_text.get(), limit=None))
+            member_ids = self.get_search_filter_ids(contact_group)
+            if member_ids is not None:
+                persons = [person for person in persons if person.person_id in member_ids]
+            for start in range(0, len(persons), PERSON_PAGE_SIZE):
+                yield persons[start:start + PERSON_PAGE_SIZE]
+        elif contact_group.group_id or contact_group is self.all_contacts_group:
+            after_key = None
+            while True:
+                persons, after_key = contact_management.get_person_page(
+                    contact_group if contact_group.group_id else None, after_key, PERSON_PAGE_SIZE)
+                yield persons
+                if after_key is None:
+                    return
+        else:
+            since = int(time.time()) - LATEST_CONTACTS_PERIOD  # für alle Seiten derselbe Zeitraum
+            after_key = None
+            while True:
+                persons, after_key = contact_management.get_recently_modified(since, PERSON_PAGE_SIZE, after_key)
+                yield persons
+                if after_key is None:
+                    return
+
+    def get_search_filter_ids(self, contact_group) -> set:
+        """IDs der Personen, auf die Suchtreffer in dieser Gruppe beschränkt werden (None bei "Alle Kontakte"); sie
+        werden nur beim ersten Suchbegriff und nach Änderungen an der Datenbank (siehe update()) neu abgefragt."""
+        if contact_group is self.all_contacts_group:
+            return None
+        if self.search_filter is None or self.search_filter[0] is not contact_group or \
+                self.search_filter[1] != self.displayed_data_version:
+            if contact_group is self.latest_contact_group:
+                member_ids = self.get_latest_person_ids()
+            else:
+                member_ids = contact_management.get_member_ids(contact_group)
+            self.search_filter = (contact_group, self.displayed_data_version, member_ids)
+        return self.search_filter[2]
+
+    @staticmethod
+    def get_latest_person_ids() -> set:
+        """IDs der in den letzten 14 Tagen geänderten Personen."""
+        persons, _ = contact_management.get_recently_modified(int(time.time()) - LATEST_CONTACTS_PERIOD, limit=None)
+        return {person.person_id for person in persons}
+
+    def load_next_person_page(self):
+        """Nächste Seite der Kontaktliste an die Tabelle anhängen."""
+        self.person_page_after_id = None
+        if self.person_pages is None:
+            return  # alle Seiten sind bereits geladen
+        persons = next(self.person_pages, None)
+        if persons is None:
+            self.person_pages = None
+            return
+        self.loaded_page_count += 1
+        person_table = self.person_table_frame.winfo_children()[0]
+        for person in persons:
             # Ein Tabelleneintrag besteht aus Vorname + Nachname.
-            # Position in der Tabelle ist die Postion der Person im Array der Personen der Gruppe.
+            # Neue Einträge werden hinten angehängt, die Seiten kommen bereits in der richtigen Reihenfolge.
             # Die ID des Tabelleneintrags ist die ID der person.
-            person_table.insert('', self.selected_contact_group.persons.index(person),
+            person_table.insert('', END,
                                 text=f'{person.first_name} {person.last_name}',
                                 iid=person.person_id, tags=(person.person_id,))
+        if not persons:
+            # eine leere Seite (alle Suchtreffer außerhalb der Gruppe) ändert den sichtbaren Bereich nicht
+            self.person_page_after_id = self.root.after_idle(self.load_next_person_page)
+
+    def person_table_scrolled(self, scrollbar, first, last):
+        """Scrollbar nachführen und die nächste Seite laden, sobald das letzte Zehntel der Tabelle sichtbar ist."""
+        scrollbar.set(first, last)
+        if float(last) >= 0.9 and self.person_pages is not None and self.person_page_after_id is None:
+            # erst im Leerlauf laden, die Tabelle ist gerade beim Neuzeichnen
+            self.person_page_after_id = self.root.after_idle(self.load_next_person_page)
+
+    def schedule_search(self):
+        """Tabelle erst aktualisieren, wenn 150 ms lang nicht weitergetippt wurde (nicht bei jedem Tastendruck)."""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(150, self.update_person_table)
 
     def on_doubleclick(self):
         person_table = self.person_table_frame.winfo_children()[0]
@@ -591,7 +763,7 @@ class ContactGroupWindow:
         if contact_group:
             self.contact_group.title = self.title.get()
             contact_management.save(self.contact_group)
-            self.parent.update_contact_group_option_menu()
+            self.parent.update()  # lädt Gruppen und Tabelle neu und merkt sich den neuen Stand der Datenbank
         self.root.destroy()
 
     def delete_contact_group_button_pressed(self):
@@ -599,7 +771,7 @@ class ContactGroupWindow:
         if messagebox.askokcancel(title='Gruppe wirklich löschen?',
                                   message='''Sie sind im Begriff die Gruppe zu löschen.\nMöchten Sie fortfahren?\nDie damit verknüpften Kontakte bleiben erhalten.'''):
             contact_management.delete(self.parent.selected_contact_group)
-            self.parent.update_contact_group_option_menu()
+            self.parent.update()  # die gelöschte Gruppe ist dann nicht mehr auswählbar, "Alle Kontakte" wird gesetzt
             self.root.destroy()
 
     def center_window(self):
@@ -659,7 +831,7 @@ class ContactGroupSelectionWindow:
 
     def calculate_contact_group_options(self):
         """Gibt mögliche Kontaktgruppen zurück"""
-        all_contact_groups = contact_management.get_all_contact_groups()
+        all_contact_groups = contact_management.get_all_contact_groups(summary_only=True)
         persons_contact_group_ids = list(map(lambda contact_group: contact_group.group_id, self.parent.person.groups))
         selectable_contact_group_options = list(
             filter(lambda contact_group: contact_group.group_id not in persons_contact_group_ids, all_contact_groups))
@@ -749,6 +921,7 @@ class PersonWindow:
         self.form_frame = Frame(self.root)
         self.build_form(self.form_frame)
         self.form_frame.pack(anchor=W, padx=10, fill=X, pady=5)
+        self.root.protocol('WM_DELETE_WINDOW', self.editing_finished)  # Schließen des Fensters wie Abbrechen
         self.center_window()
         self.root.mainloop()
 
@@ -1027,8 +1200,13 @@ class PersonWindow:
             else:
                 self.person.birthdate = None
             contact_management.save(self.person)  # Person in der Datenbank absichern
-            t = threading.Thread(target=self.parent.update)  # Tabelle im PersonWindow neu laden
-            t.start()
+            # Tabelle im ContactListWindow neu laden; im Haupt-Thread, da update() die Tabelle und ihren
+            # Seiten-Generator verändert, die auch poll_for_changes benutzt
+            self.parent.update()
+        elif self.person.person_id is not None:
+            # Die Unterfenster (Adressen, Gruppen, ...) ändern die Person direkt. Sie ist das gecachte Objekt und
+            # muss beim Abbrechen verworfen werden, damit die ungespeicherten Änderungen nicht erhalten bleiben.
+            contact_management.invalidate(self.person)
         self.root.destroy()
 
     def delete_person_button_pressed(self):
@@ -1037,10 +1215,8 @@ class PersonWindow:
         if messagebox.askokcancel(title='Kontakt wirklich löschen?',
                                   message='Sie sind im Begriff den Kontakt zu löschen.\nMöchten Sie fortfahren?'):
             contact_management.delete(self.person)
-            t = threading.Thread(
-                target=self.parent.update)  # Aktualisieren der Tabelle in einem separaten Thread behandeln
-            t.start()
-            self.root.destroy()  # derweil das PersonWindow schließen
+            self.parent.update()  # Aktualisieren der Tabelle im Haupt-Thread (siehe editing_finished)
+            self.root.destroy()  # PersonWindow schließen
 
     def center_window(self):
         """Fenster mittig zentrieren relativ zum root-Fenster"""
@@ -0,0 +1,107 @@
+import unicodedata
+
+DEFAULT_COUNTRY_CODE = '49'  # Ländervorwahl für nationale Nummern (0171 ... = +49 171 ...)
+PHONE_SUFFIX_LENGTH = 8  # so viele Endziffern müssen übereinstimmen, wenn Vorwahlen fehlen oder abweichen
+
+# Umlaute und ß werden so ersetzt, wie sie auch ohne deutsche Tastatur geschrieben werden (Müller = Mueller)
+UMLAUT_REPLACEMENTS = (('ä', 'ae'), ('ö', 'oe'), ('ü', 'ue'), ('Ä', 'Ae'), ('Ö', 'Oe'), ('Ü', 'Ue'), ('ß', 'ss'))
+
+
+def normalize_name(name: str) -> str:
+    """Namen für Vergleiche vereinheitlichen: Umlaute ausschreiben, Kleinschreibung, einfache Leerzeichen."""
+    if not name:
+        return ''
+    for umlaut, replacement in UMLAUT_REPLACEMENTS:
+        name = name.replace(umlaut, replacement)
+    return ' '.join(name.lower().split())
+
+
+def person_sort_key(last_name: str, first_name: str) -> str:
+    """Sortierschlüssel für Personenlisten nach DIN 5007 Variante 2 (Telefonbuch-Sortierung): Nachname vor Vorname,
+    Umlaute wie ausgeschrieben (Müller = Mueller), Akzente ohne Bedeutung (Rénée = Renee), ohne Beachtung der
+    Groß-/Kleinschreibung. Fehlende Namen werden als leere Zeichenkette einsortiert."""
+    # Nachname und Vorname durch einen Tabulator trennen: er ist kleiner als jedes Zeichen in Namen, daher steht
+    # "Meier" immer vor "Meier-Schulz" und "Meier Schulz", egal welche Vornamen folgen
+    key = f'{normalize_name(last_name)}\t{normalize_name(first_name)}'
+    # Akzente als eigene Zeichen abspalten (NFKD) und weglassen; Umlaute sind zu diesem Zeitpunkt schon ersetzt
+    return ''.join(char for char in unicodedata.normalize('NFKD', key) if not unicodedata.combining(char))
+
+
+def normalize_phone_number(number: str, country_code: str = DEFAULT_COUNTRY_CODE) -> str:
+    """Telefonnummer in eine einheitliche Ziffernfolge mit Ländervorwahl (E.164 ohne "+") umwandeln:
+    "+49 (0)171 / 123 45", "0049 171 12345" und "0171-12345" ergeben alle "4917112345"."""
+    if not number:
+        return ''
+    number = number.strip().replace('(0)', '')  # "+49 (0)171": die 0 wird bei internationaler Wahl weggelassen
+    digits = ''.join(char for char in number if char in '0123456789')
+    if number.startswith('+'):
+        return digits
+    if digits.startswith('00'):
+        return digits[2:]  # internationale Vorwahl 00
+    if digits.startswith('0'):
+        return country_code + digits[1:]  # nationale Nummer mit Ortsvorwahl
+    return digits  # Nummer ohne Vorwahl, kann nur über die Endziffern gefunden werden
+
+
+def normalize_email(address: str) -> str:
+    """E-Mail-Adresse für Vergleiche vereinheitlichen: ohne "mailto:", spitze Klammern und Leerzeichen, klein
+    geschrieben; '' wenn es keine E-Mail-Adresse ist."""
+    address = (address or '').strip().strip('<>').strip().lower()
+    if address.startswith('mailto:'):
+        address = address[len('mailto:'):]
+    return address if '@' in address else ''
+
+
+def reversed_email_domain(address: str) -> str:
+    """Domain einer E-Mail-Adresse (oder eine Domain) rückwärts mit abschließendem Punkt: "anna@mail.example.com" ->
+    "com.example.mail.". So liegen alle Adressen einer Domain samt Subdomains unter einem gemeinsamen Präfix."""
+    domain = (address or '').strip().lower().rpartition('@')[2].strip('<>. ')
+    return '.'.join(reversed(domain.split('.'))) + '.' if domain else ''
+
+
+def sql_fold_umlauts(expression: str) -> str:
+    """SQL-Ausdruck erzeugen, der Umlaute in expression genauso ersetzt wie normalize_name (für Trigger)."""
+    for umlaut, replacement in UMLAUT_REPLACEMENTS:
+        expression = f"replace({expression}, '{umlaut}', '{replacement}')"
+    return expression
+
+
+def trigrams(text: str) -> set:
+    """Menge der Trigramme eines normalisierten Textes; jedes Wort wird vorne mit zwei und hinten mit einem
+    Leerzeichen umrahmt, damit auch Anfangsbuchstabe und Wortende eigene Trigramme bilden
+    ("meier" -> "  m", " me", "mei", "eie", "ier", "er ")."""
+    result = set()
+    for word in text.split():
+        padded = f'  {word} '
+        result.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return result
+
+
+def edit_distance(first: str, second: str) -> int:
+    """Levenshtein-Distanz: minimale Anzahl eingefügter, gelöschter oder ersetzter Zeichen."""
+    if len(first) < len(second):
+        first, second = second, first
+    previous_row = list(range(len(second) + 1))
+    for first_index, first_char in enumerate(first, 1):
+        current_row = [first_index]
+        for second_index, second_char in enumerate(second, 1):
+            current_row.append(min(previous_row[second_index] + 1,  # Zeichen gelöscht
+                                   current_row[second_index - 1] + 1,  # Zeichen eingefügt
+                                   previous_row[second_index - 1] + (first_char != second_char)))  # ersetzt
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def similarity(first: str, second: str) -> float:
+    """Ähnlichkeit zweier normalisierter Texte anhand der Editierdistanz (0 = nichts gemeinsam, 1 = gleich)."""
+    if not first or not second:
+        return 0.0
+    return 1 - edit_distance(first, second) / max(len(first), len(second))
+
+
+def similarity_at_least(first: str, second: str, threshold: float) -> float:
+    """Wie similarity, aber 0, ohne die Editierdistanz zu berechnen, wenn schon der Längenunterschied die
+    Ähnlichkeit unter threshold drückt."""
+    if not first or not second or 1 - abs(len(first) - len(second)) / max(len(first), len(second)) < threshold:
+        return 0.0
+    return similarity(first, second)
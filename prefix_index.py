@@ -0,0 +1,86 @@
+import bisect
+import threading
+from normalization import normalize_name
+
+
+class PrefixIndex:
+    """Sortierter In-Memory-Index über normalisierte Namen für die Suche nach Namensanfängen (Type-ahead).
+    Jede Person ist unter "Vorname Nachname" und "Nachname Vorname" eingetragen. Neben den Schlüsseln hält der Index die
+    Kurzfassung (PersonSummaryVO) jeder Person, damit eine gefilterte Liste ohne Datenbankabfrage angezeigt werden
+    kann."""
+
+    def __init__(self, summaries=()):
+        self._keys = []  # sortierte Liste von (Schlüssel, person_id)
+        self._keys_by_person = {}  # person_id -> Schlüssel der Person, zum Entfernen ohne Suche
+        self._summaries = {}  # person_id -> PersonSummaryVO
+        self._lock = threading.Lock()
+        self.add_many(summaries)
+
+    @staticmethod
+    def _person_keys(person_id, first_name, last_name) -> list:
+        first_name, last_name = normalize_name(first_name), normalize_name(last_name)
+        keys = {f'{first_name} {last_name}'.strip(), f'{last_name} {first_name}'.strip()}
+        return [(key, person_id) for key in keys if key]
+
+    def add_many(self, summaries):
+        """Viele Personen als PersonSummaryVO eintragen; es wird nur einmal sortiert."""
+        with self._lock:
+            for summary in summaries:
+                self._add(summary)
+                self._keys.extend(self._keys_by_person[summary.person_id])
+            self._keys.sort()
+
+    def add(self, summary):
+        """Person eintragen oder ihre Schlüssel und Kurzfassung nach einer Änderung ersetzen."""
+        with self._lock:
+            self._add(summary)
+            for key in self._keys_by_person[summary.person_id]:
+                bisect.insort(self._keys, key)
+
+    def _add(self, summary):
+        self._remove(summary.person_id)
+        self._keys_by_person[summary.person_id] = self._person_keys(summary.person_id, summary.first_name,
+                                                                    summary.last_name)
+        self._summaries[summary.person_id] = summary
+
+    def remove(self, person_id):
+        """Person aus dem Index entfernen."""
+        with self._lock:
+            self._remove(person_id)
+
+    def _remove(self, person_id):
+        self._summaries.pop(person_id, None)
+        for key in self._keys_by_person.pop(person_id, []):
+            index = bisect.bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                del self._keys[index]
+
+    def search(self, prefix: str, limit: int = None) -> [int]:
+        """IDs der Personen, deren Name mit prefix beginnt, alphabetisch nach dem passenden Schlüssel."""
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+        person_ids = []
+        seen_ids = set()
+        with self._lock:
+            # alle Schlüssel mit dem Präfix liegen in der sortierten Liste direkt hintereinander
+            for index in range(bisect.bisect_left(self._keys, (prefix,)), len(self._keys)):
+                key, person_id = self._keys[index]
+                if not key.startswith(prefix) or (limit is not None and len(person_ids) >= limit):
+                    break
+                if person_id not in seen_ids:  # eine Person kann mit beiden Schlüsseln passen
+                    seen_ids.add(person_id)
+                    person_ids.append(person_id)
+        return person_ids
+
+    def search_summaries(self, prefix: str, limit: int = None) -> list:
+        """Wie search, aber mit den Kurzfassungen der Personen statt ihrer IDs."""
+        return self.get_summaries(self.search(prefix, limit))
+
+    def get_summaries(self, person_ids) -> list:
+        """Kurzfassungen der Personen mit diesen IDs in deren Reihenfolge; nicht eingetragene IDs werden übergangen."""
+        with self._lock:
+            return [self._summaries[person_id] for person_id in person_ids if person_id in self._summaries]
+
+    def __len__(self):
+        return len(self._keys_by_person)
@@ -0,0 +1,476 @@
+import gc
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import unittest
+import contact_management
+import database
+from value_objects import *
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Grundlage der Tests: jeder Test arbeitet mit eigenen Verbindungspools auf einer leeren, temporären Datenbank."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.directory.name, 'contact_book_test.sqlite')
+        database.configure_pool(self.db_name)
+        contact_management.configure_cache()  # nichts aus einem vorherigen Test wiederverwenden
+
+    def tearDown(self):
+        database.get_pool().close_all()
+        database.get_read_pool().close_all()
+        self.directory.cleanup()
+
+    @staticmethod
+    def create_persons(count: int, contact_group: ContactGroupVO = None, first_index=0) -> [PersonVO]:
+        """count Personen mit je einer Adresse, Telefonnummer und E-Mail-Adresse erzeugen (nicht speichern)."""
+        persons = []
+        for index in range(first_index, first_index + count):
+            person = PersonVO(last_name=f'Nachname{index}', first_name=f'Vorname{index}',
+                              groups=[contact_group] if contact_group else None)
+            person.add(AddressVO(label='Zuhause', person=person, street='Musterstr.', house_number=str(index),
+                                 zip_code='12345', town='Musterstadt'))
+            person.add(CellNumberFieldVO(label='Mobil', cell_number=f'+49 170 {index:07d}', person=person))
+            person.add(CustomFieldVO(label='Privat', field_value=f'person{index}@example.com', v_type='eMail',
+                                     person=person))
+            persons.append(person)
+        return persons
+
+
+class BulkHydrationTest(DatabaseTestCase):
+    """get_all_persons setzt eine feste Anzahl von Abfragen ab, unabhängig von der Anzahl der Kontakte."""
+
+    @staticmethod
+    def count_queries(db, operation) -> int:
+        statements = []
+        db.set_trace_callback(statements.append)
+        try:
+            operation()
+        finally:
+            db.set_trace_callback(None)
+        return len([statement for statement in statements if statement.lstrip().upper().startswith('SELECT')])
+
+    def test_query_count_is_independent_of_contact_count(self):
+        contact_group = ContactGroupVO(title='Freunde')
+        db = database.get_db()
+        database.upsert_contact_group(db, contact_group)
+        query_counts = {}
+        person_count = 0
+        for contact_count in (10, 100, 1000):
+            database.insert_persons_bulk(db, self.create_persons(contact_count - person_count, contact_group,
+                                                                 first_index=person_count))
+            person_count = contact_count
+            persons = []
+            query_counts[contact_count] = self.count_queries(db, lambda: persons.extend(database.get_all_persons(db)))
+            self.assertEqual(len(persons), contact_count)
+            self.assertTrue(all(len(person.addresses) == 1 and len(person.groups) == 1 for person in persons))
+        db.close()
+        # eine Abfrage je Tabelle: person, belongs_to/contact_group, address, cell_number_field, custom_field
+        self.assertEqual(query_counts, {10: 5, 100: 5, 1000: 5})
+
+
+class SearchIndexTest(DatabaseTestCase):
+    """Personen aus insert_persons_bulk stehen im Volltext- und Trigramm-Index wie einzeln gespeicherte Personen."""
+
+    def test_bulk_inserted_persons_are_searchable(self):
+        db = database.get_db()
+        try:
+            database.insert_persons_bulk(db, self.create_persons(3))
+            single_person = self.create_persons(1, first_index=3)[0]
+            database.insert_person(db, single_person)
+            database.insert_persons_bulk(db, self.create_persons(2, first_index=4))
+            for index in range(6):
+                for query in (f'Vorname{index}', f'Nachname{index} Musterstadt', f'{index:07d}',
+                              f'person{index}@example.com'):
+                    self.assertEqual(database.search_persons(db, query), [index + 1], query)
+            self.assertEqual(db.execute('SELECT count(*) FROM bulk_insert;').fetchone()[0], 0)
+        finally:
+            db.close()
+        for index in range(6):
+            self.assertEqual(contact_management.fuzzy_search(f'Vornahme{index} Nachnahme{index}')[0], index + 1)
+
+
+class PrefixIndexTest(DatabaseTestCase):
+    """Die Kurzfassungen im Namensindex stimmen nach Import, Änderung und Löschen mit denen aus der Datenbank überein."""
+
+    def assert_index_matches_database(self):
+        db = database.get_read_db()
+        try:
+            summaries = {summary.person_id: summary for summary in database.get_person_summaries(db)}
+        finally:
+            db.close()
+        for summary in contact_management.autocomplete_summaries('Nachname'):
+            self.assertEqual(summary, summaries.pop(summary.person_id))
+        self.assertEqual(summaries, {})
+
+    def test_summaries_follow_changes(self):
+        self.assertEqual(contact_management.autocomplete_summaries('Nachname'), [])  # Index vor dem Import aufbauen
+        contact_management.save_many(self.create_persons(3))
+        self.assert_index_matches_database()
+        person = contact_management.get_person_by_id(2)
+        person.first_name = 'Zweiter'
+        contact_management.save(person)
+        self.assert_index_matches_database()
+        self.assertEqual([summary.first_name for summary in contact_management.autocomplete_summaries('zweit')],
+                         ['Zweiter'])
+        contact_management.delete(contact_management.get_person_by_id(1))
+        self.assert_index_matches_database()
+        self.assertEqual(contact_management.get_indexed_person_summaries([3, 1, 2])[0].person_id, 3)
+
+
+class PersonPageTest(DatabaseTestCase):
+    """Die Keyset-Paginierung erreicht alle Personen, auch solche ohne sort_key."""
+
+    def test_pages_include_persons_without_sort_key(self):
+        db = database.get_db()
+        try:
+            database.insert_persons_bulk(db, self.create_persons(3))
+            # wie von einem anderen Programm eingetragen, das sort_key nicht kennt
+            db.execute('''INSERT INTO person (modification_date, last_name, first_name)
+            VALUES (0, 'Fremd', 'Eingetragen');''')
+            db.commit()
+            person_ids = []
+            persons, after_key = database.get_person_page(db, limit=1)
+            person_ids += [person.person_id for person in persons]
+            while after_key is not None:
+                persons, after_key = database.get_person_page(db, after_key=after_key, limit=1)
+                person_ids += [person.person_id for person in persons]
+            self.assertEqual(person_ids, [4, 1, 2, 3])
+            self.assertEqual([person.person_id for person in database.get_person_page(db, after_key=(None, 4))[0]],
+                             [1, 2, 3])
+        finally:
+            db.close()
+
+    @staticmethod
+    def read_all_pages(db, group_id, limit) -> [int]:
+        person_ids = []
+        after_key = ()
+        while after_key is not None:
+            persons, after_key = database.get_person_page(db, group_id, after_key or None, limit)
+            person_ids += [person.person_id for person in persons]
+        return person_ids
+
+    def test_group_pages_for_small_and_large_groups(self):
+        db = database.get_db()
+        small_contact_group_size = database.SMALL_CONTACT_GROUP_SIZE
+        try:
+            contact_group = ContactGroupVO(title='Freunde')
+            database.upsert_contact_group(db, contact_group)
+            persons = self.create_persons(30)
+            for person in persons[::3]:
+                person.groups.append(contact_group)
+            database.insert_persons_bulk(db, persons)
+            expected_person_ids = sorted((person.person_id for person in persons[::3]),
+                                         key=lambda person_id: f'nachname{person_id - 1}')
+            self.assertEqual(self.read_all_pages(db, contact_group.group_id, 4), expected_person_ids)
+            database.SMALL_CONTACT_GROUP_SIZE = 5  # die Gruppe gilt jetzt als groß
+            self.assertEqual(self.read_all_pages(db, contact_group.group_id, 4), expected_person_ids)
+        finally:
+            database.SMALL_CONTACT_GROUP_SIZE = small_contact_group_size
+            db.close()
+
+
+class IdentityMapTest(DatabaseTestCase):
+    """contact_management gibt pro ID dasselbe Objekt zurück, egal über welchen Weg es geladen wurde."""
+
+    def setUp(self):
+        super().setUp()
+        self.contact_group = ContactGroupVO(title='Freunde')
+        contact_management.save(self.contact_group)
+        contact_management.save_many(self.create_persons(3, self.contact_group))
+        contact_management.configure_cache()
+
+    def test_person_first(self):
+        person = contact_management.get_person_by_id(1)
+        members = contact_management.get_persons_by_contact_group(self.contact_group)
+        self.assertIs(members[0], person)
+        contact_group = contact_management.get_all_contact_groups()[0]
+        self.assertIs(contact_management.get_all_contact_groups(summary_only=True)[0], contact_group)
+        self.assertIs(person.groups[0], contact_group)
+        self.assertEqual(contact_group.persons, members)
+        self.assertEqual([len(member.addresses) for member in members], [1, 1, 1])
+
+    def test_contact_group_first(self):
+        contact_group = contact_management.get_all_contact_groups(summary_only=True)[0]
+        person = contact_management.get_person_by_id(2)
+        self.assertIs(contact_group.persons[1], person)
+        self.assertEqual(person.groups, [contact_group])
+        self.assertIs(contact_management.get_persons_by_contact_group(contact_group)[2].groups[0], contact_group)
+        self.assertIs(contact_management.get_contact_group_by_id(contact_group.group_id), contact_group)
+
+    def test_saved_person_is_reloaded(self):
+        person = contact_management.get_person_by_id(1)
+        person.first_name = 'Geändert'
+        contact_management.save(person)
+        reloaded_person = contact_management.get_person_by_id(1)
+        self.assertIsNot(reloaded_person, person)
+        self.assertIs(contact_management.get_persons_by_contact_group(self.contact_group)[0], reloaded_person)
+        self.assertIs(reloaded_person.groups[0], contact_management.get_all_contact_groups()[0])
+
+
+class Record:
+    """Objekt mit __dict__ pro Instanz wie die Value Objects vor __slots__, zum Vergleich des Speicherbedarfs."""
+
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+class MemoryTest(DatabaseTestCase):
+    """Speicherbedarf pro geladenem Kontakt mit __slots__ und geteilten Zeichenketten im Vergleich zu Objekten mit
+    __dict__, die aus denselben Zeilen aufgebaut werden."""
+
+    CONTACT_COUNT = 5000
+
+    @staticmethod
+    def load_as_records(db) -> [Record]:
+        """Dieselben Abfragen wie database.load_persons, aber Objekte mit __dict__ und ohne geteilte Zeichenketten."""
+        persons = {}
+        for person_id, last_name, first_name, birthdate, modification_date in db.execute(
+                'SELECT person_id, last_name, first_name, birthdate, modification_date FROM person;'):
+            persons[person_id] = Record(person_id=person_id, last_name=last_name, first_name=first_name,
+                                        birthdate=birthdate, modification_date=modification_date, groups=[],
+                                        addresses=[], cell_number_fields=[], custom_fields=[])
+        contact_groups = {}
+        for person_id, group_id, title in db.execute('''SELECT belongs_to.person_id, contact_group.group_id,
+        contact_group.title FROM belongs_to JOIN contact_group ON contact_group.group_id = belongs_to.group_id;'''):
+            contact_group = contact_groups.setdefault(group_id, Record(title=title, group_id=group_id, persons=[]))
+            persons[person_id].groups.append(contact_group)
+            contact_group.persons.append(persons[person_id])
+        for address_id, label, street, house_number, zip_code, town, person_id in db.execute(
+                'SELECT address_id, label, street, house_number, zip_code, town, person_id FROM address;'):
+            persons[person_id].addresses.append(
+                Record(address_id=address_id, label=label, town=town, zip_code=zip_code, street=street,
+                       house_number=house_number, person=persons[person_id]))
+        for cell_number_id, label, cell_number, person_id in db.execute(
+                'SELECT cell_number_id, label, cell_number, person_id FROM cell_number_field;'):
+            persons[person_id].cell_number_fields.append(
+                Record(cell_number_id=cell_number_id, label=label, cell_number=cell_number, person=persons[person_id]))
+        for field_id, label, field_value, v_type, person_id in db.execute(
+                'SELECT field_id, label, field_value, v_type, person_id FROM custom_field;'):
+            persons[person_id].custom_fields.append(
+                Record(field_id=field_id, label=label, field_value=field_value, v_type=v_type,
+                       person=persons[person_id]))
+        return list(persons.values())
+
+    @staticmethod
+    def bytes_per_contact(load) -> float:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            memory_before = tracemalloc.get_traced_memory()[0]
+            persons = load()
+            memory_used = tracemalloc.get_traced_memory()[0] - memory_before
+        finally:
+            tracemalloc.stop()
+        return memory_used / len(persons)
+
+    def test_bytes_per_hydrated_contact(self):
+        db = database.get_db()
+        try:
+            contact_group = ContactGroupVO(title='Freunde')
+            database.upsert_contact_group(db, contact_group)
+            database.insert_persons_bulk(db, self.create_persons(self.CONTACT_COUNT, contact_group))
+            with_dict = self.bytes_per_contact(lambda: self.load_as_records(db))
+            with_slots = self.bytes_per_contact(lambda: database.load_persons(db))
+            persons = database.load_persons(db)
+        finally:
+            db.close()
+        for entity in (persons[0], persons[0].groups[0], persons[0].addresses[0], persons[0].cell_number_fields[0],
+                       persons[0].custom_fields[0]):
+            self.assertFalse(hasattr(entity, '__dict__'), type(entity).__name__)
+        # gemessen wurden rund 40 % weniger; die Grenze lässt Spielraum für andere Python-Versionen
+        self.assertLess(with_slots, 0.8 * with_dict, f'{with_dict:.0f} -> {with_slots:.0f} B/contact')
+
+
+class ConcurrentAccessTest(DatabaseTestCase):
+    """Im WAL-Modus laufen Leser während eines Massenimports ohne "database is locked" und ohne Wartezeiten weiter."""
+
+    def test_readers_during_bulk_import(self):
+        contact_group = ContactGroupVO(title='Import')
+        contact_management.save(contact_group)
+        import_done = threading.Event()
+        errors = []
+        read_counts = []
+
+        def read():
+            read_count = 0
+            try:
+                # wait() statt einer Schleife ohne Pause: die Leser sollen den Import nicht durch den GIL ausbremsen
+                while not import_done.wait(0.01):
+                    persons, after_key = contact_management.get_person_page(limit=50)
+                    contact_management.get_person_page(contact_group, after_key, limit=50)
+                    contact_management.get_recently_modified(0, limit=50)
+                    contact_management.search('Vorname4711', limit=10)
+                    contact_management.find_by_email('person1@example.com')
+                    read_count += 1
+            except Exception as err:
+                errors.append(err)
+            read_counts.append(read_count)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        try:
+            for batch in range(5):
+                contact_management.save_many(self.create_persons(4000, contact_group, first_index=batch * 4000))
+        finally:
+            import_done.set()
+            for reader in readers:
+                reader.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(read_counts), 4)
+        self.assertTrue(all(read_count > 0 for read_count in read_counts))
+        read_pool_stats = database.get_pool_stats()['read']
+        self.assertEqual((read_pool_stats['waits'], read_pool_stats['timeouts']), (0, 0))
+        self.assertEqual(len(contact_management.get_person_summaries()), 20000)
+
+
+class QueryPlanTest(DatabaseTestCase):
+    """Die häufigen Abfragen pro Person oder Gruppe müssen einen Index nutzen, keinen vollständigen
+    Tabellendurchlauf."""
+
+    def setUp(self):
+        super().setUp()
+        self.db = database.get_db()
+        self.contact_group = ContactGroupVO(title='Freunde')
+        database.upsert_contact_group(self.db, self.contact_group)
+        database.insert_persons_bulk(self.db, self.create_persons(50, self.contact_group))
+        self.statements = []
+
+    def tearDown(self):
+        self.db.set_trace_callback(None)
+        self.db.close()
+        super().tearDown()
+
+    def trace(self, operation):
+        """operation(db) ausführen und die dabei abgesetzten Anweisungen (mit eingesetzten Parametern) sammeln."""
+        self.db.set_trace_callback(self.statements.append)
+        try:
+            operation(self.db)
+        finally:
+            self.db.set_trace_callback(None)
+
+    def assert_uses_indexes(self, statements, ordered_scans=()):
+        """Jeder Schritt im Plan der Anweisungen muss eine Tabelle über einen Index durchsuchen (SEARCH). Ein
+        vollständiger Durchlauf (SCAN), auch über einen Index, ist nur für Zwischenergebnisse erlaubt und für die in
+        ordered_scans genannten Schritte, die in Sortierreihenfolge laufen und per LIMIT abbrechen."""
+        # Anweisungen aus Triggern und FTS5-Interna beginnen mit '--', Transaktionssteuerung hat keinen Plan
+        statements = [statement for statement in dict.fromkeys(statements)
+                      if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE'))]
+        self.assertTrue(statements)
+        for statement in statements:
+            plan = [row[3] for row in self.db.execute('EXPLAIN QUERY PLAN ' + statement).fetchall()]
+            full_scans = [step for step in plan if step.startswith('SCAN ') and step not in ordered_scans
+                          and step != 'SCAN CONSTANT ROW' and not step.startswith('SCAN (subquery-')]
+            self.assertEqual(full_scans, [], f'{statement}\n{plan}')
+
+    def test_person_queries_use_indexes(self):
+        def operations(db):
+            person = database.get_person_by_id(db, 3)
+            database.get_addresses_by_person(db, person)
+            database.get_cell_number_fields_by_person(db, person)
+            database.get_custom_fields_by_person(db, person)
+            person.first_name = 'Geändert'
+            person.add(AddressVO(label='Arbeit', person=person, town='Musterstadt'))
+            person.remove(person.custom_fields[0])
+            database.upsert_person(db, person)
+            database.delete_person(db, person)
+
+        self.trace(operations)
+        self.assert_uses_indexes(self.statements)
+
+    def test_contact_group_queries_use_indexes(self):
+        def operations(db):
+            database.get_contact_group_by_group_id(db, self.contact_group.group_id)
+            database.get_contact_group_by_group_id(db, self.contact_group.group_id, summary_only=True)
+            persons, after_key = database.get_person_page(db, self.contact_group.group_id, limit=10)
+            database.get_person_page(db, self.contact_group.group_id, after_key, limit=10)
+            database.get_person_summaries_by_ids(db, [1, 2, 3], self.contact_group.group_id)
+            database.upsert_contact_group(db, self.contact_group)
+
+        self.trace(operations)
+        self.assert_uses_indexes(self.statements)
+
+    def test_lookup_queries_use_indexes(self):
+        def operations(db):
+            database.find_person_ids_by_phone(db, '0170 0000003')
+            database.find_person_ids_by_email(db, 'Person3@example.com')
+            database.find_person_ids_by_domain(db, 'example.com')
+            persons, after_key = database.get_recently_modified(db, 0, limit=10)
+            database.get_recently_modified(db, 0, after_key, limit=10)
+            database.get_person_page(db, limit=10)
+
+        self.trace(operations)
+        # die erste Seite aller Personen liest person_sort_key_index von Anfang an, bis LIMIT erreicht ist
+        self.assert_uses_indexes(self.statements, ordered_scans={'SCAN person USING INDEX person_sort_key_index'})
+
+    def test_large_contact_group_pages_use_ordered_scan(self):
+        small_contact_group_size = database.SMALL_CONTACT_GROUP_SIZE
+        database.SMALL_CONTACT_GROUP_SIZE = 10  # die Gruppe mit 50 Mitgliedern gilt jetzt als groß
+
+        def operations(db):
+            persons, after_key = database.get_person_page(db, self.contact_group.group_id, limit=10)
+            database.get_person_page(db, self.contact_group.group_id, after_key, limit=10)
+
+        try:
+            self.trace(operations)
+        finally:
+            database.SMALL_CONTACT_GROUP_SIZE = small_contact_group_size
+        self.assert_uses_indexes(self.statements, ordered_scans={'SCAN person USING INDEX person_sort_key_index'})
+
+    def test_cascading_deletes_use_indexes(self):
+        # ON DELETE CASCADE sucht die Kind-Einträge wie diese Anweisungen über person_id
+        self.assert_uses_indexes([f'DELETE FROM {table} WHERE person_id = 3'
+                                  for table in ('address', 'cell_number_field', 'custom_field', 'belongs_to')])
+
+
+class IdIndexTest(unittest.TestCase):
+    """Hinzufügen, Suchen und Entfernen über die ID-Indizes der Value Objects bleiben O(1) pro Eintrag."""
+
+    @staticmethod
+    def seconds_to_add(count: int) -> float:
+        contact_group = ContactGroupVO(title='Freunde')
+        persons = [PersonVO(last_name=f'Nachname{index}', person_id=index) for index in range(count)]
+        start = time.perf_counter()
+        for person in persons:
+            contact_group.add(person)
+            contact_group.entity_already_added(person)
+        return time.perf_counter() - start
+
+    def test_adding_scales_linearly(self):
+        # linear: rund viermal so lange für viermal so viele Personen, quadratisch wären es sechzehnmal so lange
+        seconds = {count: min(self.seconds_to_add(count) for _ in range(3)) for count in (10000, 40000)}
+        self.assertLess(seconds[40000], 8 * seconds[10000], seconds)
+
+    def test_index_follows_list_changes(self):
+        contact_group = ContactGroupVO(title='Freunde')
+        first, second = PersonVO(last_name='Erste', person_id=1), PersonVO(last_name='Zweite', person_id=2)
+        contact_group.add(first)
+        contact_group.persons.append(second)  # an add vorbei
+        self.assertTrue(contact_group.entity_already_added(second))
+        contact_group.persons[1] = PersonVO(last_name='Dritte', person_id=3)  # gleiche Länge: invalidate() nötig
+        contact_group._persons_index().invalidate()
+        self.assertFalse(contact_group.entity_already_added(second))
+        contact_group.persons.remove(first)  # an remove vorbei
+        self.assertFalse(contact_group.entity_already_added(first))
+        contact_group.remove(contact_group.persons[0])
+        self.assertEqual(contact_group.persons, [])
+
+    def test_index_after_restoring_ids(self):
+        contact_group = ContactGroupVO(title='Freunde')
+        person = PersonVO(last_name='Neu', groups=[contact_group])
+        assigned_ids = database.get_assigned_ids([person]) + [(contact_group, 'group_id', None)]
+        person.person_id, contact_group.group_id = 7, 3  # wie nach dem Speichern
+        self.assertTrue(contact_group.entity_already_added(person))
+        self.assertTrue(person.entity_already_added(contact_group))
+        database.restore_ids(assigned_ids)  # wie nach einem Rollback
+        contact_group.add(person)
+        self.assertEqual((len(contact_group.persons), len(person.groups)), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
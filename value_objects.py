@@ -1,9 +1,134 @@
 from exceptions import *
+from typing import NamedTuple
+
+
+def _lazy_collection(name: str) -> property:
+    """Property für eine Kind-Sammlung von PersonVO: bei verzögert geladenen Personen wird die Sammlung erst beim
+    ersten Zugriff über den Loader der Person geholt, sonst verhält sie sich wie ein normales Attribut."""
+    attribute = '_' + name
+
+    def get_collection(person):
+        if getattr(person, attribute) is None:
+            person._loader(person, name)  # der Loader setzt die Sammlung über den Setter
+        return getattr(person, attribute)
+
+    def set_collection(person, value):
+        setattr(person, attribute, value)
+
+    return property(get_collection, set_collection)
+
+
+class _IdIndex:
+    """Index neben einer öffentlichen Liste von VOs: gespeicherte Einträge nach ID, ungespeicherte (ohne ID) nach
+    Objektidentität, damit Suchen, Hinzufügen und Entfernen die Liste nicht in Python durchlaufen müssen.
+
+    Die Liste bleibt maßgeblich: wird sie ersetzt oder an add/remove vorbei verlängert oder verkürzt, wird der Index
+    beim nächsten Zugriff neu aufgebaut. Geprüft werden dafür nur Identität und Länge der Liste, damit jeder Zugriff
+    O(1) bleibt; wer Einträge an add/remove vorbei austauscht (etwa durch Zuweisung an eine Position), muss
+    invalidate() aufrufen. Nur remove muss den Eintrag weiterhin in der Liste suchen (list.remove, ohne
+    Python-Schleife), außer es ist der zuletzt hinzugefügte. IDs, die erst nach dem Eintragen vergeben wurden (beim Speichern), werden nachgetragen,
+    sobald eine ID nicht gefunden wird."""
+
+    __slots__ = ('id_attribute', 'entities', 'length', 'by_id', 'unsaved')
+
+    def __init__(self, id_attribute: str):
+        self.id_attribute = id_attribute
+        self.entities = None  # indizierte Liste
+        self.length = 0  # Länge der Liste beim letzten Abgleich
+        self.by_id = {}  # ID -> erster Eintrag mit dieser ID
+        self.unsaved = {}  # id(Eintrag) -> Eintrag ohne ID
+
+    def invalidate(self):
+        """Index beim nächsten Zugriff neu aufbauen, z. B. nachdem Einträge der Liste direkt ausgetauscht wurden."""
+        self.entities = None
+
+    def _sync(self, entities: list):
+        if entities is self.entities and len(entities) == self.length:
+            return
+        self.entities = entities
+        self.length = len(entities)
+        self.by_id = {}
+        self.unsaved = {}
+        for entity in entities:
+            self._insert(entity)
+
+    def _insert(self, entity):
+        entity_id = getattr(entity, self.id_attribute)
+        if entity_id is None:
+            self.unsaved[id(entity)] = entity
+        else:
+            self.by_id.setdefault(entity_id, entity)
+
+    def find(self, entities: list, entity):
+        """Eintrag aus entities, der entity entspricht (dieselbe ID oder, ohne ID, dasselbe Objekt), sonst None."""
+        self._sync(entities)
+        entity_id = getattr(entity, self.id_attribute)
+        if entity_id is None:
+            return self.unsaved.get(id(entity))
+        found = self.by_id.get(entity_id)
+        if found is None and self.unsaved:
+            # inzwischen gespeicherte Einträge unter ihrer neuen ID eintragen
+            for key, unsaved_entity in list(self.unsaved.items()):
+                if getattr(unsaved_entity, self.id_attribute) is not None:
+                    del self.unsaved[key]
+                    self._insert(unsaved_entity)
+            found = self.by_id.get(entity_id)
+        elif found is not None and getattr(found, self.id_attribute) != entity_id:
+            self.invalidate()  # ID des Eintrags hat sich geändert (z. B. nach einem Rollback): neu aufbauen
+            return self.find(entities, entity)
+        return found
+
+    def append(self, entities: list, entity):
+        """entity an entities anhängen und in den Index aufnehmen."""
+        self._sync(entities)
+        entities.append(entity)
+        self.length += 1
+        self._insert(entity)
+
+    def remove(self, entities: list, entity) -> bool:
+        """Den entity entsprechenden Eintrag (siehe find) aus entities entfernen; False, wenn es keinen gibt."""
+        found = self.find(entities, entity)
+        if found is None:
+            return False
+        try:
+            if entities and entities[-1] is found:
+                entities.pop()  # zuletzt hinzugefügter Eintrag: ohne Suche
+            else:
+                entities.remove(found)  # sucht nach Identität, aber ohne Python-Schleife
+        except ValueError:
+            # found wurde an add/remove vorbei aus der Liste genommen: Index neu aufbauen und erneut suchen
+            self.invalidate()
+            found = self.find(entities, entity)
+            if found is None:
+                return False
+            try:
+                entities.remove(found)
+            except ValueError as err:
+                raise NoSuchEntityException(err)
+        self.length -= 1
+        self.unsaved.pop(id(found), None)
+        entity_id = getattr(found, self.id_attribute)
+        if self.by_id.get(entity_id) is found:
+            del self.by_id[entity_id]
+        return True
 
 
 class PersonVO:
     """Value Object zum Kapseln der Daten einer Person wie sie in der Datenbank existieren."""
 
+    # __slots__ statt __dict__ pro Objekt: deutlich weniger Speicher, wenn sehr viele Kontakte geladen sind.
+    # Die Kind-Sammlungen liegen in den Slots mit Unterstrich, die gleichnamigen Properties stehen unten.
+    __slots__ = ('person_id', 'last_name', 'first_name', 'birthdate', 'modification_date',
+                 '_groups', '_addresses', '_cell_number_fields', '_custom_fields', '_loader', '_id_indexes')
+    # ID-Attribut der Einträge jeder Kind-Sammlung, für die Indizes von add, remove und entity_already_added
+    ID_ATTRIBUTES = {'groups': 'group_id', 'addresses': 'address_id', 'cell_number_fields': 'cell_number_id',
+                     'custom_fields': 'field_id'}
+    COLLECTIONS = ('groups', 'addresses', 'cell_number_fields', 'custom_fields')  # Kind-Sammlungen einer Person
+    groups = _lazy_collection('groups')
+    addresses = _lazy_collection('addresses')
+    cell_number_fields = _lazy_collection('cell_number_fields')
+    custom_fields = _lazy_collection('custom_fields')
+
     def __init__(self, last_name: str = None, first_name: str = None, birthdate: int = None,
                  modification_date: int = None, groups=None, addresses=None, cell_number_fields=None,
                  custom_fields=None,
@@ -22,6 +147,8 @@ class PersonVO:
                 and (custom_fields == [] or custom_fields is None or (type(custom_fields) == list and all(
                     type(custom_field) == CustomFieldVO for custom_field in custom_fields)))
                 and (type(person_id) == int or person_id is None)):
+            self._loader = None  # Funktion zum verzögerten Laden der Kind-Sammlungen (siehe defer_collections)
+            self._id_indexes = None  # Sammlung -> _IdIndex, erst bei Bedarf angelegt
             self.person_id = person_id
             self.last_name = last_name
             self.first_name = first_name
@@ -45,120 +172,105 @@ class PersonVO:
                     custom_field.person = self
 
             for group in self.groups:
-                if self not in group.persons:
-                    group.persons.append(self)
+                if group._persons_index().find(group.persons, self) is None:
+                    group._persons_index().append(group.persons, self)
 
         else:
             raise TypeError('Please initialize with matching data types')
 
+    @classmethod
+    def from_row(cls, person_id, last_name, first_name, birthdate, modification_date):
+        """Person aus den Spalten einer Datenbankzeile erzeugen, mit leeren Kind-Sammlungen. Nur für die
+        Datenbankschicht: die Spalten haben bereits die richtigen Typen, daher entfallen die Prüfungen von __init__."""
+        person = cls.__new__(cls)
+        person._loader = None
+        person._id_indexes = None
+        person.person_id = person_id
+        person.last_name = last_name
+        person.first_name = first_name
+        person.birthdate = birthdate
+        person.modification_date = modification_date
+        person._groups = []
+        person._addresses = []
+        person._cell_number_fields = []
+        person._custom_fields = []
+        return person
+
+    def defer_collections(self, loader):
+        """Kind-Sammlungen verwerfen und erst beim ersten Zugriff laden: loader(person, collection) muss die Sammlung
+        mit dem Namen collection (einer aus COLLECTIONS) setzen."""
+        self._loader = loader
+        self._groups = self._addresses = self._cell_number_fields = self._custom_fields = None
+
+    def is_loaded(self, collection: str) -> bool:
+        """Ob die Kind-Sammlung collection (einer aus COLLECTIONS) bereits geladen ist."""
+        return getattr(self, '_' + collection) is not None
+
     def add(self, entity):
         """Hinzufügen einer Entität (AddressVO, CellNumberFieldVO, ContactGroupVO oder CustomFieldVO) zur Person."""
-        if type(entity) == AddressVO:
-            if entity.address_id is None or not self.entity_already_added(entity):
-                # nur hinzufügen, wenn Adresse nicht bereits hinzugefügt wurde oder es sich um eine neue Adresse handelt (ID noch nicht gesetzt).
-                self.addresses.append(entity)
-            entity.person = self
-        elif type(entity) == CellNumberFieldVO:
-            if entity.cell_number_id is None or not self.entity_already_added(entity):
-                # nur hinzufügen, wenn Telefonnummer nicht bereits hinzugefügt wurde oder es sich um eine neue Telefonnummer handelt (ID noch nicht gesetzt).
-                self.cell_number_fields.append(entity)
-            entity.person = self
-        elif type(entity) == CustomFieldVO:
-            if entity.field_id is None or not self.entity_already_added(entity):
-                # nur hinzufügen, wenn benutzerdefiniertes Feld nicht bereits hinzugefügt wurde oder es sich um ein neues benutzerdefiniertes Feld handelt (ID noch nicht gesetzt).
-                self.custom_fields.append(entity)
-            entity.person = self
-        elif type(entity) == ContactGroupVO:
-            if entity.group_id is None or not self.entity_already_added(entity):
-                # nur hinzufügen, wenn ContactGroup nicht bereits hinzugefügt wurde oder es sich um eine neue Gruppe handelt (ID noch nicht gesetzt).
-                self.groups.append(entity)
-            entity.persons.append(self)
+        collection = self._collection_of(entity)
+        id_attribute = self.ID_ATTRIBUTES[collection]
+        if getattr(entity, id_attribute) is None or not self.entity_already_added(entity):
+            # nur hinzufügen, wenn die Entität nicht bereits hinzugefügt wurde oder es sich um eine neue Entität
+            # handelt (ID noch nicht gesetzt)
+            self._id_index(collection).append(getattr(self, collection), entity)
+        if collection == 'groups':
+            if not entity.entity_already_added(self):
+                # umgekehrt auch die Gruppe um die Person ergänzen
+                entity._persons_index().append(entity.persons, self)
         else:
-            # Exception werfen, wenn Typ des Objekts in der Parameterliste nicht existiert
-            raise NoSuchEntityTypeException(
-                'The entity must be of one of the following types: AddressVO, ' +
-                'CellNumberFieldVO, CustomFieldVO or ContactGroupVO')
+            entity.person = self
 
     def remove(self, entity):
-        """Entfernen einer Entität (AddressVO, CellNumberFieldVO, ContactGroupVO oder CustomFieldVO) der Person."""
-        if type(entity) == AddressVO:
-            try:
-                for address in self.addresses:
-                    if address.address_id == entity.address_id or (address is entity):
-                        # löschen, wenn IDs übereinstimmen oder Adresse zwar schon unter den Adressen aufgelistet ist, aber noch nicht abgespeichert wurde (dann keine ID vorhanden)
-                        self.addresses.remove(address)  # jedes Vorkommen unter den Adressen der Person löschen
-            except ValueError as err:
-                raise NoSuchEntityException(err)
-        elif type(entity) == CellNumberFieldVO:
-            try:
-                for cell_number_field in self.cell_number_fields:
-                    if cell_number_field.cell_number_id == entity.cell_number_id or (cell_number_field is entity):
-                        # löschen, wenn IDs übereinstimmen oder CellNumberField zwar schon unter den cell_number_fields aufgelistet ist,
-                        # aber noch nicht abgespeichert wurde (dann keine ID vorhanden)
-                        self.cell_number_fields.remove(
-                            entity)  # jedes Vorkommen unter den Telefonnummern der Person löschen
-            except ValueError as err:
-                raise NoSuchEntityException(err)
-        elif type(entity) == CustomFieldVO:
-            try:
-                for custom_field in self.custom_fields:
-                    if custom_field.field_id == entity.field_id or (custom_field is entity):
-                        # löschen, wenn IDs übereinstimmen oder CustomField zwar schon unter den custom_fields aufgelistet ist,
-                        # aber noch nicht abgespeichert wurde (dann keine ID vorhanden)
-                        self.custom_fields.remove(
-                            entity)  # jedes Vorkommen unter den benutzerdefinierten Feldern der Person löschen
-            except ValueError as err:
-                raise NoSuchEntityException(err)
-        elif type(entity) == ContactGroupVO:
-            try:
-                for group in self.groups:
-                    if group.group_id == entity.group_id or (group is entity):
-                        # löschen, wenn IDs übereinstimmen oder ContactGroup zwar schon unter den groups aufgelistet ist,
-                        # aber noch nicht abgespeichert wurde (dann keine ID vorhanden)
-                        self.groups.remove(group)  # Gruppe aus den eigenen ContactGroups löschen
-
-                for person in entity.persons:
-                    if person.person_id == self.person_id:
-                        entity.persons.remove(
-                            person)  # umgekehrt auch entfernen der Person aus der angegebenen ContactGroup
-            except ValueError as err:
-                raise NoSuchEntityException(err)
-        else:
-            # Exception werfen, wenn Entitätstyp des Objekts in der Parameterliste nicht existiert
-            raise NoSuchEntityTypeException(
-                'The entity must be of one of the following types: AddressVO, ' +
-                'CellNumberFieldVO, CustomFieldVO or ContactGroupVO')
+        """Entfernen einer Entität (AddressVO, CellNumberFieldVO, ContactGroupVO oder CustomFieldVO) der Person.
+        Entfernt wird der Eintrag mit derselben ID bzw., wenn die Entität noch nicht abgespeichert wurde (dann keine ID
+        vorhanden), die Entität selbst."""
+        collection = self._collection_of(entity)
+        self._id_index(collection).remove(getattr(self, collection), entity)
+        if collection == 'groups':
+            entity._persons_index().remove(entity.persons, self)  # umgekehrt auch die Person aus der Gruppe entfernen
 
     def entity_already_added(self, entity):
-        entity_exists = False
-        if type(entity) == AddressVO:
-            for address in self.addresses:
-                if address.address_id == entity.address_id:  # Evaluation der Existenz allein anhand der IDs
-                    entity_exists = True  # Entität existiert, sobald eine übereinstimmende ID gefunden wurde
+        """Ob die Entität bereits zur Person gehört: Vergleich anhand der IDs, ohne ID anhand des Objekts."""
+        collection = self._collection_of(entity)
+        return self._id_index(collection).find(getattr(self, collection), entity) is not None
 
-        elif type(entity) == CellNumberFieldVO:
-            for cell_number_field in self.cell_number_fields:
-                if cell_number_field.cell_number_id == entity.cell_number_id:
-                    entity_exists = True
+    def invalidate_id_indexes(self):
+        """Indizes der Kind-Sammlungen und der Gruppen über ihre Personen verwerfen, z. B. nachdem IDs zurückgesetzt
+        wurden (siehe database.restore_ids): Einträge ohne ID stehen nicht mehr unter ihrer alten ID im Index."""
+        self._id_indexes = None
+        if self.is_loaded('groups'):
+            for group in self._groups:
+                group._person_index = None
 
+    @staticmethod
+    def _collection_of(entity) -> str:
+        """Name der Kind-Sammlung, zu der entity gehört."""
+        if type(entity) == AddressVO:
+            return 'addresses'
+        elif type(entity) == CellNumberFieldVO:
+            return 'cell_number_fields'
         elif type(entity) == CustomFieldVO:
-            for custom_field in self.custom_fields:
-                if custom_field.field_id == entity.field_id:
-                    entity_exists = True
-
+            return 'custom_fields'
         elif type(entity) == ContactGroupVO:
-            for contact_group in self.groups:
-                if contact_group.group_id == entity.group_id:
-                    entity_exists = True
-        else:
-            # Exception werfen, wenn Entitätstyp des Objekts in der Parameterliste nicht existiert
-            raise NoSuchEntityTypeException(
-                'The entity must be of one of the following types: AddressVO, ' +
-                'CellNumberFieldVO, CustomFieldVO or ContactGroupVO')
-        return entity_exists
+            return 'groups'
+        # Exception werfen, wenn Entitätstyp des Objekts in der Parameterliste nicht existiert
+        raise NoSuchEntityTypeException(
+            'The entity must be of one of the following types: AddressVO, ' +
+            'CellNumberFieldVO, CustomFieldVO or ContactGroupVO')
+
+    def _id_index(self, collection: str) -> _IdIndex:
+        if self._id_indexes is None:
+            self._id_indexes = {}
+        index = self._id_indexes.get(collection)
+        if index is None:
+            index = self._id_indexes[collection] = _IdIndex(self.ID_ATTRIBUTES[collection])
+        return index
 
 
 class CellNumberFieldVO:
+    __slots__ = ('cell_number_id', 'label', 'cell_number', 'person')
+
     def __init__(self, label: str, cell_number: str, person: PersonVO, cell_number_id: int = None):
         if (type(label) == str and type(cell_number) == str and type(person) == PersonVO
                 and (type(cell_number_id) == int or cell_number_id is None)):
@@ -174,8 +286,20 @@ class CellNumberFieldVO:
             # Exception werfen, sollte ein Parameter einen falschen Typ haben
             raise TypeError('All attributes have to be of type str')
 
+    @classmethod
+    def from_row(cls, person: PersonVO, cell_number_id, label, cell_number):
+        """Telefonnummer der Person aus einer Datenbankzeile ohne Prüfungen erzeugen (siehe PersonVO.from_row)."""
+        cell_number_field = cls.__new__(cls)
+        cell_number_field.cell_number_id = cell_number_id
+        cell_number_field.label = label
+        cell_number_field.cell_number = cell_number
+        cell_number_field.person = person
+        return cell_number_field
+
 
 class AddressVO:
+    __slots__ = ('address_id', 'label', 'town', 'zip_code', 'street', 'house_number', 'person')
+
     def __init__(self, label: str, person: PersonVO, street: str = None, house_number: str = None,
                  zip_code: str = None,
                  town: str = None, address_id: int = None):
@@ -201,8 +325,23 @@ class AddressVO:
             # Exception werfen, sollte ein Parameter einen falschen Typ haben
             raise TypeError('All attributes have to be of type str')
 
+    @classmethod
+    def from_row(cls, person: PersonVO, address_id, label, street, house_number, zip_code, town):
+        """Adresse der Person aus einer Datenbankzeile ohne Prüfungen erzeugen (siehe PersonVO.from_row)."""
+        address = cls.__new__(cls)
+        address.address_id = address_id
+        address.label = label
+        address.town = town
+        address.zip_code = zip_code
+        address.street = street
+        address.house_number = house_number
+        address.person = person
+        return address
+
 
 class CustomFieldVO:
+    __slots__ = ('field_id', 'label', 'field_value', 'v_type', 'person')
+
     def __init__(self, label: str, field_value: str, person: PersonVO, field_id: int = None,
                  v_type: str = None):
         if (type(label) == str and type(field_value) == str and type(person) == PersonVO
@@ -222,8 +361,22 @@ class CustomFieldVO:
             # Exception werfen, sollte ein Parameter einen falschen Typ haben
             raise TypeError('All attributes have to be of type str')
 
+    @classmethod
+    def from_row(cls, person: PersonVO, field_id, label, field_value, v_type):
+        """Benutzerdefiniertes Feld der Person aus einer Datenbankzeile ohne Prüfungen erzeugen (siehe
+        PersonVO.from_row)."""
+        custom_field = cls.__new__(cls)
+        custom_field.field_id = field_id
+        custom_field.label = label
+        custom_field.field_value = field_value
+        custom_field.v_type = v_type
+        custom_field.person = person
+        return custom_field
+
 
 class ContactGroupVO:
+    __slots__ = ('title', 'group_id', 'persons', '_person_index')
+
     def __init__(self, title: str, persons: [PersonVO] = None, group_id: int = None):
         if (type(title) == str
                 and (persons == [] or persons is None or (
@@ -233,10 +386,11 @@ class ContactGroupVO:
                 self.title = title
                 self.group_id = group_id
                 self.persons = (persons or [])
+                self._person_index = None  # _IdIndex über persons, erst bei Bedarf angelegt
 
                 for person in self.persons:  # sicherstellen, dass alle Personen in der Gruppe auch selber die Gruppe enthalten
-                    if self not in person.groups:
-                        person.groups.append(self)
+                    if person._id_index('groups').find(person.groups, self) is None:
+                        person._id_index('groups').append(person.groups, self)
             else:
                 # Exception werfen, sollte ein benötigter Parameter leer sein
                 raise ValueError('Title must not be empty')
@@ -244,39 +398,66 @@ class ContactGroupVO:
             # Exception werfen, sollte ein Parameter einen falschen Typ haben
             raise TypeError('All parameter datatypes have to match')
 
+    @classmethod
+    def from_row(cls, group_id, title, persons: [PersonVO] = None):
+        """ContactGroup aus einer Datenbankzeile ohne Prüfungen erzeugen (siehe PersonVO.from_row). Die Gruppe wird
+        ohne Suche bei allen persons eingetragen, diese dürfen sie also noch nicht enthalten."""
+        contact_group = cls.__new__(cls)
+        contact_group.group_id = group_id
+        contact_group.title = title
+        contact_group.persons = persons if persons is not None else []
+        contact_group._person_index = None
+        for person in contact_group.persons:
+            person.groups.append(contact_group)
+        return contact_group
+
     def add(self, entity: PersonVO):
         if type(entity) == PersonVO:
             if not self.entity_already_added(entity):
-                self.persons.append(entity)
-            if self not in entity.groups:
-                entity.groups.append(self)
+                self._persons_index().append(self.persons, entity)
+            if entity._id_index('groups').find(entity.groups, self) is None:
+                # umgekehrt auch die Person um die Gruppe ergänzen (Vergleich anhand der IDs wie bei PersonVO.add)
+                entity._id_index('groups').append(entity.groups, self)
         else:
             # Exception werfen, wenn ein anderer (Entitäts-)Typ als PersonVO angegeben wird
             raise IllegalEntityTypeException('The entity must be of type PersonVO')
 
     def remove(self, entity: PersonVO):
         if type(entity) == PersonVO:
-            try:
-                for person in self.persons:
-                    if person.person_id == entity.person_id:
-                        self.persons.remove(person)  # Person aus den eigenen Personen löschen
-                for group in entity.groups:
-                    if group.group_id == self.group_id:
-                        entity.groups.remove(group)  # umgekehrt auch entfernen der Gruppe aus der angegebenen Person
-            except ValueError as err:
-                raise NoSuchEntityException(
-                    'The given entity does not exist in the list of group members (persons)' + err)
+            self._persons_index().remove(self.persons, entity)  # Person aus den eigenen Personen löschen
+            # umgekehrt auch entfernen der Gruppe aus der angegebenen Person
+            entity._id_index('groups').remove(entity.groups, self)
         else:
             # Exception werfen, wenn ein anderer (Entitäts-)Typ als PersonVO angegeben wird
             raise IllegalEntityTypeException('The entity must be of type PersonVO')
 
     def entity_already_added(self, entity):
-        existence = False
-        if type(entity) == AddressVO:
-            for address in self.addresses:
-                if address.address_id == entity.address_id:  # Evaluation der Existenz allein anhand der IDs
-                    existence = True  # Entität existiert, sobald eine übereinstimmende ID gefunden wurde
+        """Ob die Person bereits zur Gruppe gehört: Vergleich anhand der IDs, ohne ID anhand des Objekts."""
+        if type(entity) == PersonVO:
+            return self._persons_index().find(self.persons, entity) is not None
         else:
             raise NoSuchEntityTypeException(
                 'The entity must be of one of the following types: PersonVO')
-        return existence
+
+    def invalidate_id_indexes(self):
+        """Index über die Personen und die Gruppen-Indizes der Personen verwerfen (siehe
+        PersonVO.invalidate_id_indexes)."""
+        self._person_index = None
+        for person in self.persons:
+            if person._id_indexes is not None:
+                person._id_indexes.pop('groups', None)
+
+    def _persons_index(self) -> _IdIndex:
+        if self._person_index is None:
+            self._person_index = _IdIndex('person_id')
+        return self._person_index
+
+
+class PersonSummaryVO(NamedTuple):
+    """Unveränderliche Kurzfassung einer Person für Listenansichten: nur ID, Namen und Änderungsdatum, ohne Gruppen,
+    Adressen, Telefonnummern und benutzerdefinierte Felder. Die vollständige Person wird erst bei Bedarf geladen."""
+    person_id: int
+    last_name: str
+    first_name: str
+    modification_date: int
+    sort_key: tuple  # Position in der Personenliste, after_key für die nächste Seite ab dieser Person
@@ -115,20 +115,34 @@ def import_persons(file):
 
     data = dataraw.rsplit('END:VCARD')  # unterteilt die Datei bei dem Endpunkt von einer vcard Datei: END:VCARD
 
-    for i in data:  # fügt die unterteilten Kontakte unserer Datenbank hinzu
-        card = i + 'END:VCARD'  # fügt das vcard File-Ende wieder an
-        if len(i) > 20:  # überprüft, dass wir keine falschen Eingaben wie z. B.: nur END:VCARD übergeben
-            import_person(card)  # ruft die Importfunktion für jede vCard auf
+    # neu angelegte Gruppen und alle Kontakte werden gemeinsam gespeichert oder bei einem Fehler gemeinsam verworfen
+    with contact_management.transaction():
+        persons = []
+        # einmal für alle vCards laden; für die Zuordnung über den Titel genügen die Gruppen ohne ihre Mitglieder
+        all_contact_groups = contact_management.get_contact_groups_without_members()
+        for i in data:  # wandelt die unterteilten Kontakte in Personen um
+            card = i + 'END:VCARD'  # fügt das vcard File-Ende wieder an
+            if len(i) > 20:  # überprüft, dass wir keine falschen Eingaben wie z. B.: nur END:VCARD übergeben
+                persons.append(parse_person(card, all_contact_groups))  # wandelt jede vCard in eine Person um
+        contact_management.save_many(persons)  # alle Kontakte gesammelt speichern
 
 
 def import_person(v_card_serialized: str):
+    """importiert eine einzelne vCard als Person in die Datenbank"""
+    with contact_management.transaction():  # Gruppen und Person gemeinsam speichern
+        contact_management.save(parse_person(v_card_serialized))
+
+
+def parse_person(v_card_serialized: str, all_contact_groups: [ContactGroupVO] = None) -> PersonVO:
+    """wandelt eine vCard in ein PersonVO-Objekt um, ohne sie zu speichern (Gruppen werden bei Bedarf angelegt)"""
     v_card_serialized.replace('\n', '\r\n')  # Ohne diese Ersetzung schlägt readOne-Funktion fehl
     v_card = vobject.readOne(v_card_serialized)  # serialisierte vCard einlesen
     person = PersonVO()  # Person zum Auffüllen der vCard-Werte instanziieren
     addresses = []
     cell_number_fields = []
     custom_fields = []
-    all_contact_groups = contact_management.get_all_contact_groups()
+    if all_contact_groups is None:
+        all_contact_groups = contact_management.get_contact_groups_without_members()
     # alle ContactGroup-Titel extrahieren, um beim import zu überprüfen, ob schon eine geeignete Gruppe existiert,
     # in die der Kontakt importiert werden könnte
     all_contact_group_titles = [contact_group.title for contact_group in all_contact_groups]
@@ -327,9 +341,10 @@ def import_person(v_card_serialized: str):
                         if title not in all_contact_group_titles and title:
                             # sollte die Gruppe noch nicht existieren, erst eine neue erstellen
                             # und Variablen, die die Gruppenangaben enthalten aktualisieren
-                            contact_management.save(ContactGroupVO(title=title))
-                            all_contact_groups = contact_management.get_all_contact_groups()
-                            all_contact_group_titles = [contact_group.title for contact_group in all_contact_groups]
+                            new_contact_group = ContactGroupVO(title=title)
+                            contact_management.save(new_contact_group)
+                            all_contact_groups.append(new_contact_group)  # auch für folgende vCards bekannt machen
+                            all_contact_group_titles.append(title)
 
                         # Der Person der ContactGroup zuordnen, auf die der Titel passt (auch wenn diese gleichnamig sind)
                         for contact_group in all_contact_groups:
@@ -357,7 +372,7 @@ def import_person(v_card_serialized: str):
     person.addresses = addresses
     person.cell_number_fields = cell_number_fields
     person.custom_fields = custom_fields
-    contact_management.save(person)
+    return person
 
 
 if __name__ == '__main__':